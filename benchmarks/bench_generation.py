@@ -0,0 +1,261 @@
+"""
+End-to-end generation benchmark against fake providers.
+
+Runs DatasetService.generate_and_save_dataset for every combination of
+backend, record count and concurrency level. The OpenAI and Claude
+generators talk to a local fake HTTP server and the local model is replaced
+by an in-process fake, all with the same latency, token rate and share of
+truncated responses. Reports throughput, job latency percentiles and peak
+Python memory per scenario, plus the CPU cost of parsing and writing records,
+as JSON. With --baseline, fails if throughput or p95 latency regressed by
+more than --tolerance.
+
+Usage:
+    python benchmarks/bench_generation.py [--backends local,openai,claude] [--records 10,100,1000]
+        [--concurrency 1,4] [--repeat 3] [--latency 0.2] [--tokens-per-second 2000]
+        [--malformed-rate 0.0] [--output results.json] [--baseline previous.json] [--tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+# Also puts the repository root on sys.path for the imports below
+from fake_providers import FakeCompletions, FakeLocalGenerator, FakeModelConfig, FakeProviderServer
+import fake_providers
+
+from src.config import settings
+from src.config.settings import MODEL_TYPES, OUTPUT_FORMATS
+from src.generators.base import IncrementalJSONParser
+from src.generators.factory import GeneratorFactory, GeneratorSpec
+from src.models.request import GenerationRequest
+from src.services.dataset_service import DatasetService
+from src.services.response_cache import ResponseCache
+from src.services.writers import create_writer, output_extension
+
+BACKENDS = {
+    "local": MODEL_TYPES.LOCAL,
+    "openai": MODEL_TYPES.OPENAI,
+    "claude": MODEL_TYPES.CLAUDE,
+}
+
+PROMPT = "Generate a dataset of landscape features with names, categories and scores"
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+def install_fakes(config: FakeModelConfig, server: FakeProviderServer) -> None:
+    """Route every backend to a fake and lift the client-side quotas"""
+    fake_providers.LOCAL_CONFIG = config
+    GeneratorFactory.register_generator(MODEL_TYPES.LOCAL, GeneratorSpec("fake_providers", "FakeLocalGenerator"))
+    os.environ["OPENAI_BASE_URL"] = f"{server.url}/v1"
+    os.environ["ANTHROPIC_BASE_URL"] = server.url
+    # The rate limiter would otherwise measure the configured quotas, not the code
+    settings.RATE_LIMITS.clear()
+
+async def run_round(service: DatasetService, model_type: str, records: int, concurrency: int) -> Dict[str, Any]:
+    """Run ``concurrency`` jobs at once and time each of them"""
+    async def job() -> Tuple[float, int, bool]:
+        produced = 0
+
+        def count(_):
+            nonlocal produced
+            produced += 1
+
+        request = GenerationRequest(PROMPT, records, model_type, api_key="fake-key", use_cache=False)
+        started = time.perf_counter()
+        filepath, _ = await service.generate_and_save_dataset(request, on_record=count)
+        return time.perf_counter() - started, produced, bool(filepath)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(job() for _ in range(concurrency)))
+    return {
+        "wall_seconds": time.perf_counter() - started,
+        "latencies": [latency for latency, _, _ in results],
+        "records": sum(produced for _, produced, _ in results),
+        "errors": sum(1 for _, _, ok in results if not ok),
+    }
+
+def run_scenario(backend: str, records: int, concurrency: int, repeat: int, work_dir: str) -> Dict[str, Any]:
+    """Benchmark one backend, record count and concurrency combination"""
+    scenario_dir = tempfile.mkdtemp(dir=work_dir)
+    service = DatasetService(output_dir=scenario_dir, cache=ResponseCache(os.path.join(scenario_dir, "cache")))
+    model_type = BACKENDS[backend]
+
+    rounds = [asyncio.run(run_round(service, model_type, records, concurrency)) for _ in range(repeat)]
+
+    # Separate traced round, tracemalloc would skew the timings above
+    tracemalloc.start()
+    asyncio.run(run_round(service, model_type, records, concurrency))
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    service.catalog.close()
+    latencies = [latency for run in rounds for latency in run["latencies"]]
+    wall_seconds = sum(run["wall_seconds"] for run in rounds)
+    generated = sum(run["records"] for run in rounds)
+    return {
+        "backend": backend,
+        "records": records,
+        "concurrency": concurrency,
+        "jobs": len(latencies),
+        "records_generated": generated,
+        "records_requested": records * len(latencies),
+        "errors": sum(run["errors"] for run in rounds),
+        "records_per_second": generated / wall_seconds if wall_seconds else 0.0,
+        "latency_seconds": {
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies),
+        },
+        "peak_memory_bytes": peak_memory,
+    }
+
+def measure_overhead(records: int, work_dir: str) -> Dict[str, Any]:
+    """CPU time spent parsing a streamed completion and writing its records"""
+    completions = FakeCompletions(FakeModelConfig())
+    # The real prompt, the fake reads the record count from it
+    prompt = FakeLocalGenerator()._create_generation_prompt(GenerationRequest(PROMPT, records, MODEL_TYPES.LOCAL))
+    text = completions.render(prompt)
+    chunks = list(completions.chunks(text))
+
+    parser = IncrementalJSONParser()
+    started = time.perf_counter()
+    parsed = [record for chunk in chunks for record in parser.feed(chunk)]
+    parse_seconds = time.perf_counter() - started
+    assert len(parsed) == records, f"parsed {len(parsed)} of {records} records"
+
+    write_seconds = {}
+    for output_format in OUTPUT_FORMATS:
+        path = os.path.join(work_dir, f"overhead_{records}{output_extension(output_format, None)}")
+        try:
+            started = time.perf_counter()
+            with create_writer(output_format, path) as writer:
+                writer.write_many(parsed)
+            write_seconds[output_format] = time.perf_counter() - started
+        except ImportError:
+            # pyarrow is optional
+            write_seconds[output_format] = None
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    return {
+        "records": records,
+        "completion_bytes": len(text.encode("utf-8")),
+        "parse_seconds": parse_seconds,
+        "parse_microseconds_per_record": parse_seconds / records * 1e6,
+        "write_seconds": write_seconds,
+    }
+
+def find_regressions(scenarios: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Compare scenarios with a previous report"""
+    previous = {
+        (run["backend"], run["records"], run["concurrency"]): run for run in baseline.get("scenarios", [])
+    }
+    regressions = []
+    for run in scenarios:
+        before = previous.get((run["backend"], run["records"], run["concurrency"]))
+        if before is None:
+            continue
+
+        name = f"{run['backend']} records={run['records']} concurrency={run['concurrency']}"
+        if run["records_per_second"] < before["records_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {run['records_per_second']:.1f} < {before['records_per_second']:.1f} records/s"
+            )
+        if run["latency_seconds"]["p95"] > before["latency_seconds"]["p95"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 latency {run['latency_seconds']['p95']:.3f} > {before['latency_seconds']['p95']:.3f} s"
+            )
+    return regressions
+
+def parse_list(value: str, cast=str) -> list:
+    return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="local,openai,claude", help=f"comma-separated: {', '.join(BACKENDS)}")
+    parser.add_argument("--records", default="10,100,1000", help="comma-separated record counts")
+    parser.add_argument("--concurrency", default="1,4", help="comma-separated numbers of simultaneous jobs")
+    parser.add_argument("--repeat", type=int, default=3, help="rounds per scenario")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake time to first token, in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0, help="fake generation speed")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of truncated fake responses")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    parser.add_argument("--baseline", help="previous report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    backends = parse_list(args.backends)
+    unknown = [backend for backend in backends if backend not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(unknown)}")
+    record_counts = parse_list(args.records, int)
+    concurrency_levels = parse_list(args.concurrency, int)
+
+    config = FakeModelConfig(
+        latency_seconds=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed
+    )
+    work_dir = tempfile.mkdtemp(prefix="bench_generation_")
+    try:
+        with FakeProviderServer(config) as server:
+            install_fakes(config, server)
+            scenarios = [
+                run_scenario(backend, records, concurrency, args.repeat, work_dir)
+                for backend in backends
+                for records in record_counts
+                for concurrency in concurrency_levels
+            ]
+        overhead = [measure_overhead(records, work_dir) for records in record_counts]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline: Optional[Dict[str, Any]] = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    report = {
+        "benchmark": "generation",
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "config": {
+            "repeat": args.repeat,
+            "latency_seconds": args.latency,
+            "tokens_per_second": args.tokens_per_second,
+            "malformed_rate": args.malformed_rate,
+            "seed": args.seed,
+        },
+        "scenarios": scenarios,
+        "overhead": overhead,
+        "regressions": find_regressions(scenarios, baseline, args.tolerance) if baseline else [],
+    }
+    report["passed"] = not report["regressions"] and not any(run["errors"] for run in scenarios)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    return 0 if report["passed"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Startup-time benchmark for API-only deployments.
+
+Boots the service layer in a fresh interpreter with torch, transformers and
+bitsandbytes made unimportable, selects an API backend and reports how long
+that took. Fails if any of the local-model dependencies were imported or the
+median boot time exceeds the limit.
+
+Usage:
+    python benchmarks/bench_startup.py [--model-type Claude] [--runs 5] [--max-seconds 5] [--include-ui]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("torch", "transformers", "bitsandbytes", "accelerate")
+
+# Runs in the child interpreter, the heavy modules are blocked before any import
+CHILD_SCRIPT = """
+import importlib.abc
+import json
+import sys
+import time
+
+HEAVY_MODULES = {heavy!r}
+
+class BlockHeavyModules(importlib.abc.MetaPathFinder):
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] in HEAVY_MODULES:
+            raise ImportError(f"{{name}} is blocked for the API-only startup benchmark")
+        return None
+
+sys.meta_path.insert(0, BlockHeavyModules())
+
+start = time.perf_counter()
+if {include_ui!r}:
+    from src.ui.app import DatasetGeneratorApp
+    DatasetGeneratorApp()
+else:
+    from src.services.job_manager import JobManager
+    JobManager()
+boot_seconds = time.perf_counter() - start
+
+from src.generators.registry import generator_registry
+with generator_registry.acquire({model_type!r}):
+    pass
+select_seconds = time.perf_counter() - start - boot_seconds
+
+print(json.dumps({{
+    "boot_seconds": boot_seconds,
+    "select_seconds": select_seconds,
+    "heavy_modules_loaded": sorted(m for m in HEAVY_MODULES if m in sys.modules),
+}}))
+"""
+
+def run_once(model_type: str, include_ui: bool) -> dict:
+    """Boot the app once in a fresh interpreter and return its timings"""
+    script = CHILD_SCRIPT.format(heavy=HEAVY_MODULES, include_ui=include_ui, model_type=model_type)
+    # Boot in a scratch directory, the service would otherwise open and prune
+    # the repository's own catalog, response cache and checkpoints
+    python_path = os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")]))
+    with tempfile.TemporaryDirectory() as work_dir:
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=work_dir,
+            env=dict(os.environ, PYTHONPATH=python_path),
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-type", default="Claude", help="API backend to select after boot")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="limit for the median total time")
+    parser.add_argument("--include-ui", action="store_true", help="also import Gradio and build the app")
+    args = parser.parse_args()
+
+    runs = [run_once(args.model_type, args.include_ui) for _ in range(args.runs)]
+    totals = [run["boot_seconds"] + run["select_seconds"] for run in runs]
+    heavy_loaded = sorted({module for run in runs for module in run["heavy_modules_loaded"]})
+
+    report = {
+        "model_type": args.model_type,
+        "include_ui": args.include_ui,
+        "runs": args.runs,
+        "boot_seconds_median": statistics.median(run["boot_seconds"] for run in runs),
+        "select_seconds_median": statistics.median(run["select_seconds"] for run in runs),
+        "total_seconds_median": statistics.median(totals),
+        "total_seconds_max": max(totals),
+        "heavy_modules_loaded": heavy_loaded,
+    }
+    report["passed"] = not heavy_loaded and report["total_seconds_median"] <= args.max_seconds
+    print(json.dumps(report, indent=2))
+
+    return 0 if report["passed"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
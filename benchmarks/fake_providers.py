@@ -0,0 +1,252 @@
+"""
+Stand-in model backends for benchmarks.
+
+``FakeProviderServer`` speaks just enough of the OpenAI chat completions and
+Anthropic messages APIs (plain and streaming) for the real generators to run
+against it. ``FakeLocalGenerator`` replaces the local model in-process. Both
+produce deterministic records at a configurable latency and token rate, and
+truncate a configurable share of their responses.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.generators.base import DatasetGenerator
+from src.models.request import GenerationRequest
+
+CHARS_PER_TOKEN = 4
+CHUNK_TOKENS = 4
+
+_WORDS = (
+    "amber basalt cedar delta ember fjord granite harbor iris juniper kestrel lagoon "
+    "meadow nectar orchid prairie quartz river sierra tundra umber valley willow yarrow"
+).split()
+
+@dataclass
+class FakeModelConfig:
+    """Behaviour of a fake backend"""
+    latency_seconds: float = 0.2  # time to first token
+    tokens_per_second: float = 2000.0
+    malformed_rate: float = 0.0  # share of responses cut off mid-record
+    seed: int = 0
+
+class FakeCompletions:
+    """Deterministic dataset completions shared by the fake backends"""
+
+    def __init__(self, config: FakeModelConfig):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def render(self, prompt: str) -> str:
+        """Completion text answering a generation prompt"""
+        match = re.search(r"Generate exactly (\d+) records", prompt)
+        num_records = int(match.group(1)) if match else 10
+
+        with self._lock:
+            records = []
+            for _ in range(num_records):
+                self._counter += 1
+                records.append({
+                    "id": self._counter,
+                    "name": f"{self._rng.choice(_WORDS)}-{self._counter}",
+                    "category": self._rng.choice(_WORDS),
+                    "score": round(self._rng.random() * 100, 2),
+                    "description": " ".join(self._rng.choice(_WORDS) for _ in range(12)),
+                })
+            malformed = self._rng.random() < self.config.malformed_rate
+
+        text = json.dumps(records, indent=2)
+        if malformed:
+            # Cut off part-way through, like a completion that hit its token limit
+            text = text[:int(len(text) * 0.7)]
+        return text
+
+    def chunks(self, text: str) -> Iterator[str]:
+        size = CHUNK_TOKENS * CHARS_PER_TOKEN
+        for start in range(0, len(text), size):
+            yield text[start:start + size]
+
+    def total_seconds(self, text: str) -> float:
+        return self.config.latency_seconds + self.chunk_seconds(text)
+
+    def chunk_seconds(self, text: str) -> float:
+        return len(text) / CHARS_PER_TOKEN / self.config.tokens_per_second
+
+    @staticmethod
+    def usage(prompt: str, text: str) -> Dict[str, int]:
+        prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+        completion_tokens = len(text) // CHARS_PER_TOKEN
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+
+class _ProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    completions: FakeCompletions
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        if isinstance(prompt, list):
+            prompt = " ".join(part.get("text", "") for part in prompt)
+        text = self.completions.render(prompt)
+        usage = self.completions.usage(prompt, text)
+
+        if self.path.endswith("/chat/completions"):
+            events = self._openai_events(body, text, usage)
+        elif self.path.endswith("/messages"):
+            events = self._anthropic_events(body, text, usage)
+        else:
+            self.send_error(404)
+            return
+
+        time.sleep(self.completions.config.latency_seconds)
+        if not body.get("stream"):
+            time.sleep(self.completions.chunk_seconds(text))
+            self._send_json(next(events))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in events:
+            self._write_chunk(event.encode("utf-8"))
+        self._write_chunk(b"")
+
+    def _openai_events(self, body: Dict[str, Any], text: str, usage: Dict[str, int]) -> Iterator[Any]:
+        model = body.get("model", "fake")
+        openai_usage = {**usage, "total_tokens": usage["prompt_tokens"] + usage["completion_tokens"]}
+        if not body.get("stream"):
+            yield {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{
+                    "index": 0, "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": text},
+                }],
+                "usage": openai_usage,
+            }
+            return
+
+        def chunk(choices: List[Dict[str, Any]], chunk_usage: Any = None) -> str:
+            payload = {
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": model, "choices": choices, "usage": chunk_usage,
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        for piece in self.completions.chunks(text):
+            time.sleep(self.completions.chunk_seconds(piece))
+            yield chunk([{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+        yield chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        yield chunk([], openai_usage)
+        yield "data: [DONE]\n\n"
+
+    def _anthropic_events(self, body: Dict[str, Any], text: str, usage: Dict[str, int]) -> Iterator[Any]:
+        message = {
+            "id": "msg_fake", "type": "message", "role": "assistant", "model": body.get("model", "fake"),
+            "stop_reason": None, "stop_sequence": None,
+        }
+        if not body.get("stream"):
+            yield {
+                **message, "stop_reason": "end_turn",
+                "content": [{"type": "text", "text": text}],
+                "usage": {"input_tokens": usage["prompt_tokens"], "output_tokens": usage["completion_tokens"]},
+            }
+            return
+
+        def event(name: str, payload: Dict[str, Any]) -> str:
+            return f"event: {name}\ndata: {json.dumps({'type': name, **payload})}\n\n"
+
+        yield event("message_start", {"message": {
+            **message, "content": [], "usage": {"input_tokens": usage["prompt_tokens"], "output_tokens": 0},
+        }})
+        yield event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+        for piece in self.completions.chunks(text):
+            time.sleep(self.completions.chunk_seconds(piece))
+            yield event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": piece}})
+        yield event("content_block_stop", {"index": 0})
+        yield event("message_delta", {
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": usage["completion_tokens"]},
+        })
+        yield event("message_stop", {})
+
+    def _send_json(self, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeProviderServer:
+    """
+    Local HTTP server imitating the OpenAI and Anthropic APIs.
+
+    Point the SDKs at it with ``OPENAI_BASE_URL=<url>/v1`` and
+    ``ANTHROPIC_BASE_URL=<url>``.
+    """
+
+    def __init__(self, config: FakeModelConfig, host: str = "127.0.0.1", port: int = 0):
+        handler = type("Handler", (_ProviderHandler,), {"completions": FakeCompletions(config)})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-provider", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeProviderServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+# Settings picked up by FakeLocalGenerator instances, set before they are created
+LOCAL_CONFIG = FakeModelConfig()
+
+class FakeLocalGenerator(DatasetGenerator):
+    """In-process stand-in for the local model, no GPU or weights needed"""
+
+    max_output_tokens = 8192
+
+    def __init__(self):
+        self.model_name = "fake-local"
+        self._completions = FakeCompletions(LOCAL_CONFIG)
+
+    async def generate_dataset(self, request: GenerationRequest) -> List[Dict[str, Any]]:
+        text = self._completions.render(self._create_generation_prompt(request))
+        await asyncio.sleep(self._completions.total_seconds(text))
+        return self._extract_json_from_response(text)
+
+    async def _stream_completion(self, request: GenerationRequest) -> AsyncIterator[str]:
+        text = self._completions.render(self._create_generation_prompt(request))
+        await asyncio.sleep(self._completions.config.latency_seconds)
+        for piece in self._completions.chunks(text):
+            await asyncio.sleep(self._completions.chunk_seconds(piece))
+            yield piece
@@ -1,13 +1,37 @@
 """
 Dataset Generator - Main Entry Point
+
+Usage:
+    python main.py                        # launch the web UI
+    python main.py batch requests.jsonl   # headless batch mode, see --help
+    python main.py compact                # merge datasets into one deduplicated file, see --help
+    python main.py resume [job_id ...]    # finish stopped jobs, or list them, see --help
 """
 
-from src.ui.app import DatasetGeneratorApp
+import sys
+
+from src.generators.registry import generator_registry
+from src.config.settings import WARMUP_MODELS
 
 def main():
     """Main entry point for the dataset generator application"""
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        # Imported here so batch runs never load Gradio or start the web server
+        from src.cli.batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "compact":
+        from src.cli.compact import main as compact_main
+        sys.exit(compact_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "resume":
+        from src.cli.resume import main as resume_main
+        sys.exit(resume_main(sys.argv[2:]))
+
+    from src.ui.app import DatasetGeneratorApp
+
+    generator_registry.warmup(WARMUP_MODELS)
+
     app = DatasetGeneratorApp()
     app.launch(share=False)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,66 @@
+"""
+Headless batch mode: generate every request in a JSONL file without the UI.
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import List, Optional
+
+from ..services.batch_runner import BatchCheckpoint, BatchEntry, BatchResult, BatchRunner, load_batch_file
+from ..services.dataset_service import DatasetService
+from ..config.settings import BATCH_CHECKPOINT_SUFFIX, BATCH_CONCURRENCY, OUTPUT_DIR
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py batch",
+        description="Generate datasets for every request in a JSONL file. Interrupted runs resume "
+                    "from a checkpoint, so finished entries are not generated again."
+    )
+    parser.add_argument("requests_file", help="JSONL file with one GenerationRequest object (and optional id) per line")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="entries generated at the same time")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="directory for the generated datasets")
+    parser.add_argument("--checkpoint", help=f"checkpoint file (default: <requests_file>{BATCH_CHECKPOINT_SUFFIX})")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and generate every entry")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a batch file, returning the process exit status"""
+    args = build_parser().parse_args(argv)
+
+    try:
+        entries = load_batch_file(args.requests_file)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    checkpoint = BatchCheckpoint(args.checkpoint or args.requests_file + BATCH_CHECKPOINT_SUFFIX)
+    if args.restart:
+        checkpoint.finished.clear()
+
+    finished = 0
+    pending = sum(1 for entry in entries if entry.key not in checkpoint.finished)
+    print(f"{len(entries)} entries, {len(entries) - pending} already finished, {pending} to generate")
+
+    def report(entry: BatchEntry, result: BatchResult) -> None:
+        nonlocal finished
+        finished += 1
+        rate = result.records / result.seconds if result.seconds > 0 else 0.0
+        print(
+            f"[{finished}/{pending}] line {entry.line_number} ({entry.key}): {result.status} "
+            f"{result.records} records in {result.seconds:.1f}s ({rate:.1f} records/s)",
+            flush=True
+        )
+
+    runner = BatchRunner(DatasetService(args.output_dir), checkpoint, args.concurrency, on_result=report)
+    try:
+        summary = asyncio.run(runner.run(entries))
+    except KeyboardInterrupt:
+        print(f"Interrupted, finished entries are saved in {checkpoint.path}", file=sys.stderr)
+        return 130
+
+    print(
+        f"Done: {summary.completed} generated, {summary.skipped} skipped, {summary.failed} failed. "
+        f"{summary.records} records in {summary.elapsed_seconds:.1f}s ({summary.records_per_second:.1f} records/s)"
+    )
+    return 1 if summary.failed else 0
@@ -0,0 +1,73 @@
+"""
+Merge generated datasets into one deduplicated, compressed file.
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from ..services.dataset_service import DatasetService
+from ..services.writers import OUTPUT_EXTENSIONS
+from ..config.settings import COMPACT_COMPRESSION, COMPACT_OUTPUT_FORMAT, OUTPUT_DIR, OUTPUT_FORMATS
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py compact",
+        description="Merge datasets into one file, dropping duplicate records across all of them. "
+                    "Records are streamed, so collections larger than memory can be merged."
+    )
+    parser.add_argument("inputs", nargs="*", help="dataset files or directories (default: every dataset in the output directory)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="directory for the merged file")
+    parser.add_argument("--format", default=COMPACT_OUTPUT_FORMAT, choices=OUTPUT_FORMATS, help="format of the merged file")
+    parser.add_argument("--compression", default=COMPACT_COMPRESSION, help="compression of the merged file, 'none' for none")
+    parser.add_argument("--no-dedup", action="store_true", help="keep duplicate records")
+    parser.add_argument("--dedup-fields", help="comma-separated fields compared for duplicates (default: all but ids)")
+    parser.add_argument("--near-dedup", action="store_true", help="also drop near-duplicate records")
+    parser.add_argument("--remove-inputs", action="store_true", help="delete the merged datasets from the output directory")
+    return parser
+
+def _collect_inputs(inputs: List[str], service: DatasetService) -> List[str]:
+    """Dataset files named directly or found in the given directories, oldest first"""
+    if not inputs:
+        return list(reversed(service.get_generated_files()))
+
+    paths = []
+    for name in inputs:
+        if os.path.isdir(name):
+            found = [
+                os.path.join(name, entry) for entry in os.listdir(name)
+                if entry.endswith(OUTPUT_EXTENSIONS)
+            ]
+            paths.extend(sorted(found, key=os.path.getmtime))
+        else:
+            paths.append(name)
+    return paths
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Compact datasets, returning the process exit status"""
+    args = build_parser().parse_args(argv)
+    service = DatasetService(args.output_dir)
+
+    paths = _collect_inputs(args.inputs, service)
+    missing = [path for path in paths if not os.path.isfile(path)]
+    if missing:
+        print(f"❌ Not found: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    try:
+        filepath, written, dropped = service.compact_datasets(
+            paths,
+            output_format=args.format,
+            compression=None if args.compression in (None, "none") else args.compression,
+            dedup=not args.no_dedup,
+            dedup_fields=args.dedup_fields.split(",") if args.dedup_fields else None,
+            near_dedup=args.near_dedup,
+            remove_inputs=args.remove_inputs
+        )
+    except (OSError, ValueError, ImportError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    print(f"Merged {len(paths)} datasets into {filepath}: {written} records, {dropped} duplicates dropped")
+    return 0
@@ -0,0 +1,64 @@
+"""
+Finish jobs that stopped before their dataset was complete.
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import List, Optional
+
+from ..services.dataset_service import DatasetService
+from ..config.settings import OUTPUT_DIR
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py resume",
+        description="Resume jobs that failed, were cancelled or were interrupted, generating only the "
+                    "records they are missing. Without job IDs, lists the jobs that can be resumed."
+    )
+    parser.add_argument("job_ids", nargs="*", help="IDs of the jobs to resume, as shown in their status message")
+    parser.add_argument("--all", action="store_true", help="resume every stopped job")
+    parser.add_argument("--api-key", help="API key for the jobs' provider (default: the provider's environment variable)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="directory the jobs were generating into")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Resume or list stopped jobs, returning the process exit status"""
+    args = build_parser().parse_args(argv)
+    service = DatasetService(args.output_dir)
+
+    resumable = service.list_resumable_jobs()
+    if not args.job_ids and not args.all:
+        if not resumable:
+            print("No stopped jobs to resume")
+        for job_id in resumable:
+            request = service.checkpoint_request(job_id)
+            print(f"{job_id}  {request.model_type}  {request.num_records} records  {request.prompt}")
+        return 0
+
+    job_ids = resumable if args.all else args.job_ids
+    unknown = [job_id for job_id in job_ids if job_id not in resumable]
+    if unknown:
+        print(f"❌ No checkpoint found for job {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    incomplete = 0
+    for job_id in job_ids:
+        request = service.checkpoint_request(job_id, args.api_key)
+        records = 0
+
+        def count(_):
+            nonlocal records
+            records += 1
+
+        try:
+            filepath, status = asyncio.run(service.resume_job(job_id, args.api_key, on_record=count))
+        except KeyboardInterrupt:
+            print(f"Interrupted, run `main.py resume {job_id}` again to continue", file=sys.stderr)
+            return 130
+
+        print(f"{job_id}: {status}" + (f" Saved to {filepath}" if filepath else ""), flush=True)
+        if records < request.num_records:
+            incomplete += 1
+
+    return 1 if incomplete else 0
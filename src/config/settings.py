@@ -3,6 +3,7 @@ Configuration settings for the dataset generator.
 """
 
 import os
+from typing import Optional
 
 # Models configurations
 LLAMA_MODEL: str = "meta-llama/Meta-Llama-3.1-8B-Instruct"
@@ -14,20 +15,140 @@ class MODEL_TYPES:
     LOCAL = "Local (Llama 3.1 8B)"
     OPENAI = "OpenAI GPT"
     CLAUDE = "Claude"
+    MULTI = "Multi-provider"
 
 # File system settings
 OUTPUT_DIR: str = "generated_datasets"
-MAX_RECORDS: int = 50
+MAX_RECORDS: int = 10000
 MIN_RECORDS: int = 1
+OUTPUT_FORMATS: list[str] = ["json", "jsonl", "csv", "parquet", "arrow"]
+DEFAULT_OUTPUT_FORMAT: str = "json"
+PARQUET_ROW_GROUP_SIZE: int = 1000  # records buffered per Parquet/Arrow row group
+CATALOG_FILENAME: str = ".catalog.sqlite3"  # dataset catalog, stored inside the output directory
+INDEX_SUFFIX: str = ".idx"  # sidecar record offset index written next to JSON and JSONL datasets
+COMPACT_OUTPUT_FORMAT: str = "parquet"  # format of files merged by the compact command
+COMPACT_COMPRESSION: Optional[str] = "zstd"
 
 # UI settings
 DEFAULT_RECORDS: int = 10
 SERVER_HOST: str = "0.0.0.0"
 SERVER_PORT: int = 7860
+PREVIEW_ROWS: int = 50  # latest records shown while a dataset is generated
 
 # Generation settings
-MAX_TOKENS: int = 2048
-TEMPERATURE: float = 0.7
+MAX_TOKENS: Optional[int] = None  # cap on the output tokens of one completion, None keeps each model's own limit
+TEMPERATURE: float = 0.7  # sampling temperature of generators that accept one
+GENERATION_TIMEOUT_SECONDS: Optional[float] = 3600.0  # default deadline per request, None for no deadline
+
+# Sharded generation settings
+TOKENS_PER_RECORD_ESTIMATE: int = 150  # output tokens per record assumed until usage has been observed
+MAX_RECORDS_PER_BATCH: int = 50  # upper bound on records requested in a single completion
+PROVIDER_CONCURRENCY: dict[str, int] = {  # concurrent batches per provider, shared by all running requests
+    MODEL_TYPES.LOCAL: 8,  # submitted together so the local batch scheduler can group them
+    MODEL_TYPES.OPENAI: 8,
+    MODEL_TYPES.CLAUDE: 4,
+    MODEL_TYPES.MULTI: 12,
+}
+
+# Shard sizing settings
+SHARD_SIZING_ENABLED: bool = True  # size batches and their output budget from observed tokens per record
+SHARD_TOKEN_HEADROOM: float = 0.25  # output budget kept beyond a batch's expected completion
+SHARD_SIZING_SMOOTHING: float = 0.3  # weight of the latest batch in each tokens/record average
+SHARD_SIZING_MAX_PROMPTS: int = 1024  # prompts whose tokens/record averages are remembered
+
+# Shard planning settings
+PLANNING_ENABLED: bool = True  # plan distinct subtopics for the batches of a split request
+PLAN_RECORDS_PER_SUBTOPIC: int = 10  # how many records share a planned subtopic
+PLAN_MAX_SUBTOPICS: int = 200  # cap on the subtopics planned in one call
+SHARD_TEMPERATURE_SPREAD: float = 0.2  # batch temperatures are spread this far around the base temperature
+
+# Multi-provider settings
+MULTI_PROVIDER_BACKENDS: list[str] = [MODEL_TYPES.OPENAI, MODEL_TYPES.CLAUDE]  # shards are split across these
+PROVIDER_API_KEY_ENV_VARS: dict[str, str] = {  # where the multi-provider generator finds each backend's key
+    MODEL_TYPES.OPENAI: "OPENAI_API_KEY",
+    MODEL_TYPES.CLAUDE: "ANTHROPIC_API_KEY",
+}
+THROUGHPUT_SMOOTHING: float = 0.3  # weight of the latest batch in each backend's records/second average
+HEDGE_ENABLED: bool = True
+HEDGE_LATENCY_PERCENTILE: float = 0.95  # duplicate a batch once it runs longer than this share of recent ones
+HEDGE_MIN_DELAY_SECONDS: float = 10.0  # never hedge sooner than this
+HEDGE_HISTORY_SIZE: int = 50  # recent batch latencies kept per backend
+
+# Validation settings
+VALIDATION_ENABLED: bool = True
+SCHEMA_SAMPLE_SIZE: int = 5  # records used to infer a schema when none is supplied
+QUARANTINE_DIRNAME: str = "quarantine"  # rejected records, stored inside the output directory
+
+# Checkpoint settings
+CHECKPOINT_ENABLED: bool = True  # log records as they are produced so failed jobs can be resumed
+CHECKPOINT_DIRNAME: str = ".checkpoints"  # stored inside the output directory
+CHECKPOINT_FSYNC_INTERVAL_SECONDS: float = 1.0  # records logged since the last fsync can be lost in a power failure
+CHECKPOINT_RETENTION_SECONDS: Optional[float] = 7 * 24 * 3600  # logs of stopped jobs untouched this long are deleted, None keeps them
+
+# Deduplication settings
+DEDUP_ENABLED: bool = True
+DEDUP_IGNORE_FIELDS: list[str] = ["id"]  # fields that differ between otherwise identical records
+NEAR_DUP_BANDS: int = 8  # LSH bands x rows sets the similarity threshold, about (1/bands) ** (1/rows)
+NEAR_DUP_ROWS: int = 4
+
+# Retry settings
+RETRY_MAX_ATTEMPTS: int = 3  # follow-up generations for records that are still missing
+RETRY_BACKOFF_BASE_SECONDS: float = 1.0
+RETRY_BACKOFF_MAX_SECONDS: float = 30.0
+RETRY_BUDGET_PER_MINUTE: dict[str, float] = {  # follow-up generations allowed per provider
+    MODEL_TYPES.LOCAL: 10,
+    MODEL_TYPES.OPENAI: 30,
+    MODEL_TYPES.CLAUDE: 30,
+    MODEL_TYPES.MULTI: 30,
+}
+
+# Rate limit settings, set these to your account's quota
+RATE_LIMITS: dict[str, dict[str, int]] = {
+    MODEL_TYPES.OPENAI: {"requests_per_minute": 500, "tokens_per_minute": 200000},
+    MODEL_TYPES.CLAUDE: {"requests_per_minute": 50, "tokens_per_minute": 40000},
+}
+RATE_LIMIT_MAX_RETRIES: int = 5  # attempts after HTTP 429 responses
+
+# Local model batching settings
+LOCAL_MAX_BATCH_SIZE: int = 8  # prompts generated together in one padded batch
+LOCAL_BATCH_WINDOW_MS: float = 50.0  # how long to collect prompts before running a batch
+
+# Local model prefix cache settings
+LOCAL_PREFIX_CACHE_ENABLED: bool = True  # reuse the attention state of prompt prefixes shared between requests
+LOCAL_PREFIX_CACHE_MAX_MB: int = 1024  # GPU memory for cached prefixes, least recently used ones are evicted
+LOCAL_PREFIX_BLOCK_TOKENS: int = 32  # prefixes are matched in blocks of this many tokens
+
+# Job queue settings
+MAX_PENDING_JOBS: int = 100  # queued + running jobs accepted before new submissions are rejected
+MODEL_JOB_SLOTS: dict[str, int] = {  # jobs allowed to run at once per model
+    MODEL_TYPES.LOCAL: 2,  # GPU access itself is serialized by the local batch scheduler
+    MODEL_TYPES.OPENAI: 4,
+    MODEL_TYPES.CLAUDE: 4,
+    MODEL_TYPES.MULTI: 4,
+}
+JOB_POLL_INTERVAL_SECONDS: float = 0.5
+JOB_RETENTION_SECONDS: float = 3600.0  # how long finished jobs stay available for polling
+
+# Batch mode settings
+BATCH_CONCURRENCY: int = 4  # batch file entries generated at the same time
+BATCH_CHECKPOINT_SUFFIX: str = ".checkpoint.jsonl"  # finished entries, stored next to the batch file
+
+# Response cache settings
+CACHE_ENABLED: bool = True
+CACHE_DIR: str = ".dataset_cache"
+CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # least recently used entries are evicted beyond this
+CACHE_TTL_SECONDS: float = 7 * 24 * 3600.0
+CACHE_MAX_RECORDS: int = 1000  # larger datasets are streamed to disk without being cached
+
+# Generator registry settings
+GENERATOR_IDLE_TIMEOUT_MINUTES: float = 15.0  # unload generators unused for this long
+WARMUP_MODELS: list[str] = []  # model types to load at startup, e.g. [MODEL_TYPES.LOCAL]
+
+# Monitoring settings
+METRICS_ENABLED: bool = True  # serve Prometheus metrics at /metrics next to the UI
+METRICS_HOST: str = SERVER_HOST
+METRICS_PORT: int = 7861
+TRACE_LOG_PATH: Optional[str] = None  # append one JSON line of stage timings per request, e.g. "traces.jsonl"
 
 # Ensure output directory exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
\ No newline at end of file
@@ -2,18 +2,187 @@
 Abstract base class for dataset generators
 """
 
+import asyncio
 import json
 from abc import ABC, abstractmethod
 import re
-from typing import Any, Dict, List
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
 
 from ..models.request import GenerationRequest
+from .rate_limit import get_rate_limiter, parse_retry_after
+from ..monitoring.tracing import add_tokens, record_span, record_time_to_first_token, span
+from ..config.settings import (
+    MAX_RECORDS_PER_BATCH, 
+    MAX_TOKENS, 
+    RATE_LIMIT_MAX_RETRIES, 
+    SHARD_TOKEN_HEADROOM, 
+    TEMPERATURE, 
+    TOKENS_PER_RECORD_ESTIMATE
+)
+
+T = TypeVar("T")
+
+class IncrementalJSONParser:
+    """
+    Incremental parser that extracts record objects from a streamed JSON array.
+
+    Chunks of completion text are fed in as they arrive and every top-level
+    object is returned as soon as its closing brace has been seen. Braces inside
+    string values are ignored, and any text between records (markdown fences,
+    array brackets, commas, prose) is skipped. Models sometimes wrap the array
+    in an object such as ``{"records": [...]}``, so an object outside any array
+    whose first value is an array of objects is treated as a wrapper: its
+    array's objects are returned as they close and the rest of the wrapper is
+    ignored.
+    """
+
+    # Characters that matter outside and inside a string value
+    _RECORD_START = re.compile(r'\{')
+    _STRUCTURAL = re.compile(r'[{}"]')
+    _STRING_SPECIAL = re.compile(r'["\\]')
+    # Inside a wrapper, between records and before the first value of a possible wrapper
+    _WRAPPED_NEXT = re.compile(r'[{\]]')
+    _WRAPPER_STRUCTURAL = re.compile(r'[{}"\[]')
+    _NON_SPACE = re.compile(r'\S')
+
+    def __init__(self):
+        self._buffer: List[str] = []  # text of the record currently being assembled
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._in_array = False  # an opening bracket was seen between records
+        self._wrapper_keys: Optional[int] = None  # strings seen in an object that may be a wrapper
+        self._wrapper_bracket = False  # a possible wrapper's first value is an array
+        self._wrapped = False  # inside a wrapper's array of records
+        self._finished = False  # a wrapper's array of records has ended
+        self.skipped = 0  # complete objects that were not valid JSON
+
+    @property
+    def has_partial_record(self) -> bool:
+        """Whether a record has been started but not yet closed"""
+        return self._depth > 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume a chunk of completion text.
+
+        Args:
+            chunk (str): The next piece of streamed text.
+
+        Returns:
+            List[Dict[str, Any]]: Records completed by this chunk.
+        """
+        records = []
+        start = 0
+        pos = 0
+        length = len(chunk)
+
+        while pos < length and not self._finished:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                match = self._STRING_SPECIAL.search(chunk, pos)
+                if match is None:
+                    break
+                pos = match.start()
+                if chunk[pos] == '\\':
+                    self._escape = True
+                else:
+                    self._in_string = False
+                pos += 1
+                continue
+
+            if self._wrapper_bracket:
+                match = self._NON_SPACE.search(chunk, pos)
+                if match is None:
+                    break
+                pos = match.start()
+                self._wrapper_bracket = False
+                if chunk[pos] == '{':
+                    # The object wraps the records, return them as they close
+                    self._buffer = []
+                    self._depth = 0
+                    self._in_array = self._wrapped = True
+
+            if self._depth == 0:
+                if self._wrapped:
+                    match = self._WRAPPED_NEXT.search(chunk, pos)
+                    if match is not None and chunk[match.start()] == ']':
+                        self._finished = True
+                        break
+                else:
+                    match = self._RECORD_START.search(chunk, pos)
+                    if not self._in_array:
+                        self._in_array = chunk.find("[", pos, match.start() if match else length) != -1
+                if match is None:
+                    break
+                start = pos = match.start()
+                self._wrapper_keys = None if self._in_array else 0
+
+            pattern = self._STRUCTURAL if self._wrapper_keys is None else self._WRAPPER_STRUCTURAL
+            match = pattern.search(chunk, pos)
+            if match is None:
+                break
+            pos = match.start()
+            char = chunk[pos]
+
+            if char == '"':
+                self._in_string = True
+                if self._wrapper_keys is not None and self._depth == 1:
+                    # A second string is a value or another key, either way not a wrapper
+                    self._wrapper_keys = self._wrapper_keys + 1 if self._wrapper_keys == 0 else None
+            elif char == '[':
+                # Only looked for in a possible wrapper, right after its first key
+                self._wrapper_bracket = self._wrapper_keys == 1
+                self._wrapper_keys = None
+            elif char == '{':
+                self._depth += 1
+                if self._depth > 1:
+                    self._wrapper_keys = None
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._buffer.append(chunk[start:pos + 1])
+                    record = self._decode_record("".join(self._buffer))
+                    if record is not None:
+                        records.append(record)
+                    self._buffer = []
+            pos += 1
+
+        if self._depth > 0:
+            self._buffer.append(chunk[start:])
+
+        return records
+
+    def _decode_record(self, text: str) -> Optional[Dict[str, Any]]:
+        """Decode a top-level object, tolerating trailing commas"""
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                record = json.loads(re.sub(r',\s*([}\]])', r'\1', text))
+            except json.JSONDecodeError:
+                self.skipped += 1
+                return None
+
+        if not isinstance(record, dict):
+            self.skipped += 1
+            return None
+        return record
 
 class DatasetGenerator(ABC):
     """
     Abstract base class for dataset generators.
     """
 
+    # Output token limit of a single completion on this model
+    max_output_tokens: int = 8192
+    # Sampling temperature, None leaves the provider default
+    temperature: Optional[float] = TEMPERATURE
+
     @abstractmethod
     def generate_dataset(self, request: GenerationRequest) -> List[Dict[str, Any]]:
         """
@@ -26,6 +195,142 @@ class DatasetGenerator(ABC):
             List[Dict[str, Any]]: The generated datasets.
         """
         pass
+
+    async def stream_dataset(self, request: GenerationRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a dataset, yielding each record as soon as it is complete
+
+        Args:
+            request (GenerationRequest): The dataset generation request.
+
+        Yields:
+            Dict[str, Any]: Generated records in the order they are produced.
+        """
+        parser = IncrementalJSONParser()
+        produced = 0
+        
+        chunks = self._stream_completion(request).__aiter__()
+        first_chunk = True
+        waiting_since = time.perf_counter()
+        while True:
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                record_span("generation", time.perf_counter() - waiting_since, produced)
+                break
+            
+            # Only time spent waiting on the model counts as generation
+            now = time.perf_counter()
+            if first_chunk:
+                record_time_to_first_token(now - waiting_since)
+                first_chunk = False
+            record_span("generation", now - waiting_since)
+            
+            with span("parse"):
+                records = parser.feed(chunk)
+            for record in records:
+                produced += 1
+                yield record
+            waiting_since = time.perf_counter()
+        
+        if produced == 0:
+            raise Exception("Failed to parse JSON from model response: no complete records found")
+
+    async def _stream_completion(self, request: GenerationRequest) -> AsyncIterator[str]:
+        """
+        Stream the raw completion text for a request.
+
+        Generators without native streaming fall back to producing the whole
+        dataset at once and emitting it as a single chunk.
+        """
+        dataset = await self.generate_dataset(request)
+        yield json.dumps(dataset, ensure_ascii=False)
+
+    def settings_fingerprint(self) -> Dict[str, Any]:
+        """Generator settings that influence the generated output"""
+        return {
+            "generator": type(self).__name__,
+            "model_name": getattr(self, "model_name", None),
+            "temperature": self.temperature,
+            "max_output_tokens": self.output_token_limit(),
+        }
+
+    def output_token_limit(self, request: Optional[GenerationRequest] = None) -> int:
+        """Output token budget of one completion, lowered by MAX_TOKENS and the request's own budget"""
+        limit = self.max_output_tokens if MAX_TOKENS is None else min(self.max_output_tokens, MAX_TOKENS)
+        if request is not None and request.max_tokens is not None:
+            limit = min(limit, request.max_tokens)
+        return limit
+
+    def sampling_temperature(self, request: GenerationRequest) -> Optional[float]:
+        """Temperature for a request, generators with a fixed temperature ignore overrides"""
+        if self.temperature is None or request.temperature is None:
+            return self.temperature
+        return request.temperature
+
+    def records_per_batch(self, tokens_per_record: float = TOKENS_PER_RECORD_ESTIMATE) -> int:
+        """Number of records that comfortably fit in one completion's token budget"""
+        # Keep a safety margin so batches are not truncated by the output limit
+        budget = self.output_token_limit() / (tokens_per_record * (1 + SHARD_TOKEN_HEADROOM))
+        return max(1, min(MAX_RECORDS_PER_BATCH, int(budget)))
+
+    def _estimate_request_tokens(self, request: GenerationRequest, prompt: str) -> int:
+        """Rough token cost of a request: the prompt plus the expected completion"""
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = min(self.output_token_limit(request), request.num_records * TOKENS_PER_RECORD_ESTIMATE)
+        return prompt_tokens + completion_tokens
+
+    async def _call_rate_limited(
+        self, 
+        request: GenerationRequest, 
+        estimated_tokens: int, 
+        call: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Dispatch a provider call through the shared rate limiter.
+
+        Calls rejected with HTTP 429 are retried after the provider's
+        Retry-After (or an exponential backoff when it gives none), pausing
+        every other call with the same API key in the meantime.
+        """
+        limiter = get_rate_limiter(request.model_type, request.api_key)
+        
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            if limiter is not None:
+                await limiter.acquire(estimated_tokens)
+            try:
+                return await call()
+            except Exception as e:
+                retry_after = parse_retry_after(e)
+                if retry_after is None or attempt == RATE_LIMIT_MAX_RETRIES:
+                    raise
+                
+                delay = retry_after or min(60.0, 2.0 ** attempt)
+                if limiter is not None:
+                    limiter.pause(delay)
+                else:
+                    await asyncio.sleep(delay)
+
+    def _settle_usage(
+        self, 
+        request: GenerationRequest, 
+        estimated_tokens: int, 
+        input_tokens: int, 
+        output_tokens: int
+    ) -> None:
+        """Correct the rate limiter's reservation with the reported usage and record it"""
+        add_tokens(input_tokens, output_tokens)
+        limiter = get_rate_limiter(request.model_type, request.api_key)
+        if limiter is not None:
+            limiter.settle(estimated_tokens, input_tokens + output_tokens)
+
+    def warmup(self) -> None:
+        """Load any heavy resources ahead of the first request (no-op by default)"""
+        pass
+
+    def unload(self) -> None:
+        """Release heavy resources held by the generator (no-op by default)"""
+        pass
     
     def _extract_json_from_response(self, response: Any) -> List[Dict[str, Any]]:
         """
@@ -38,49 +343,85 @@ class DatasetGenerator(ABC):
             List[Dict[str, Any]]: The extracted JSON data.
         """
         
-        try:
-            # Clean the response first
-            response = response.strip()
-            
-            # Remove markdown code blocks if present
-            response = re.sub(r'```json\s*', '', response)
-            response = re.sub(r'```\s*$', '', response)
-            
-            # Try to find JSON array in the response
-            start_idx = response.find('[')
-            end_idx = response.rfind(']')
-            
-            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                json_str = response[start_idx:end_idx + 1]
-                json_str = self._fix_json_issues(json_str)
+        with span("parse"):
+            try:
+                # Clean the response first
+                response = response.strip()
                 
-                return json.loads(json_str)
-            else:
-                return json.loads(response)
+                # Remove markdown code blocks if present
+                response = re.sub(r'```json\s*', '', response)
+                response = re.sub(r'```\s*$', '', response)
+                
+                # Try to find JSON array in the response
+                start_idx = response.find('[')
+                end_idx = response.rfind(']')
+                
+                if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
+                    json_str = response[start_idx:end_idx + 1]
+                    json_str = self._fix_json_issues(json_str)
+                    
+                    return json.loads(json_str)
+                else:
+                    return json.loads(response)
             
-        except json.JSONDecodeError as e:
-            raise Exception(f"Failed to parse JSON from model response: {str(e)}")
+            except json.JSONDecodeError as e:
+                # Salvage every complete record from a truncated or partly malformed response
+                records = IncrementalJSONParser().feed(response)
+                if records:
+                    return records
+                raise Exception(f"Failed to parse JSON from model response: {str(e)}")
         
     def _fix_json_issues(self, json_str: str) -> str:
         """Attempt to fix common JSON formatting issues"""
         json_str = re.sub(r',\s*}', '}', json_str)
         json_str = re.sub(r',\s*]', ']', json_str)
         
-        if json_str.count('{') > json_str.count('}'):
-            json_str += '}' * (json_str.count('{') - json_str.count('}'))
+        # Close unterminated strings and brackets, ignoring brackets inside strings
+        closers = []
+        in_string = False
+        escape = False
+        for char in json_str:
+            if in_string:
+                if escape:
+                    escape = False
+                elif char == '\\':
+                    escape = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == '{':
+                closers.append('}')
+            elif char == '[':
+                closers.append(']')
+            elif char in '}]' and closers:
+                closers.pop()
         
-        if json_str.count('[') > json_str.count(']'):
-            json_str += ']' * (json_str.count('[') - json_str.count(']'))
+        if in_string:
+            json_str += '"'
         
-        return json_str
+        return json_str + ''.join(reversed(closers))
 
     def _create_generation_prompt(self, request: GenerationRequest) -> str:
         """Create a standardized prompt for dataset generation"""
         
-        return f"""Generate a JSON dataset with {request.num_records} records based on this request: {request.prompt}
-                Return only a valid JSON array. Each record should contain relevant metadata fields.
-                Generate exactly {request.num_records} records in this format:
+        # The parts that differ between batches of a request come last, so the
+        # batches share the rest of the prompt as a prefix that prompt caches can reuse
+        focus = ""
+        if request.subtopics:
+            focus = f"""
+                Only cover these subtopics, spreading the records evenly across them: {"; ".join(request.subtopics)}"""
+        
+        if request.schema:
+            schema = json.dumps(request.schema, ensure_ascii=False)
+            return f"""Generate a JSON dataset based on this request: {request.prompt}
+                Return only a valid JSON array. Every record must conform to this JSON Schema: {schema}{focus}
+                Generate exactly {request.num_records} records."""
+        
+        return f"""Generate a JSON dataset based on this request: {request.prompt}
+                Return only a valid JSON array. Each record should contain relevant metadata fields, in this format:
                 [
                     {{"field1": "value1", "field2": "value2"}},
                     {{"field1": "value3", "field2": "value4"}}
-                ]"""
\ No newline at end of file
+                ]{focus}
+                Generate exactly {request.num_records} records."""
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Micro-batching scheduler for blocking batch inference
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class MicroBatchScheduler(Generic[T, R]):
+    """
+    Groups concurrent calls into batches for a blocking batch function.
+
+    Items submitted within a short window (or until the batch is full) are run
+    together in a worker thread, and each caller receives its own result. Only
+    one batch runs at a time, and other users of the device can take the same
+    lock through ``exclusive()``.
+    """
+
+    def __init__(self, run_batch: Callable[[List[T]], List[R]], max_batch_size: int, window_ms: float):
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = window_ms / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._device_lock: Optional[asyncio.Lock] = None
+
+    async def submit(self, item: T) -> R:
+        """Queue an item for the next batch and wait for its result"""
+        self._bind_loop()
+        future = self._loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = self._loop.call_later(self.window, self._flush)
+
+        return await future
+
+    @asynccontextmanager
+    async def exclusive(self) -> AsyncIterator[None]:
+        """Hold the device for work that can't be batched"""
+        self._bind_loop()
+        async with self._device_lock:
+            yield
+
+    def _bind_loop(self) -> None:
+        """Attach scheduler state to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+            self._device_lock = asyncio.Lock()
+
+    def _flush(self) -> None:
+        """Start a batch with the items collected so far"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            self._loop.create_task(self._execute(batch))
+
+    async def _execute(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        """Run one batch in a worker thread and hand out the results"""
+        # Drop callers that gave up while waiting
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+
+        async with self._device_lock:
+            try:
+                results = await asyncio.to_thread(self._run_batch, [item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
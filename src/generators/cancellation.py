@@ -0,0 +1,128 @@
+"""
+Cooperative cancellation and deadlines for dataset generation
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class GenerationCancelled(Exception):
+    """Raised when a generation is cancelled or runs past its deadline"""
+    pass
+
+class CancelToken:
+    """
+    Thread-safe flag that stops a generation.
+
+    Async code is cancelled through callbacks registered on the token, and
+    blocking code such as local inference polls ``cancelled``. A token with
+    a deadline cancels itself once the deadline passes.
+    """
+
+    def __init__(self):
+        self.reason: Optional[str] = None
+        self.deadline: Optional[float] = None
+        self._deadline_reason = ""
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def set_timeout(self, seconds: float) -> None:
+        """Cancel the generation if it is still running after ``seconds``"""
+        self.deadline = time.monotonic() + seconds
+        self._deadline_reason = f"deadline of {seconds:g}s exceeded"
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline, None without one"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def cancelled(self) -> bool:
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.expire()
+        return self.reason is not None
+
+    def expire(self) -> None:
+        """Cancel the generation because its deadline passed"""
+        self.cancel(self._deadline_reason)
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Stop the generation, only the first reason is kept"""
+        with self._lock:
+            if self.reason is not None:
+                return
+            self.reason = reason
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Call ``callback`` when the token is cancelled, right away if it already is.
+
+        Returns a function that unregisters the callback.
+        """
+        with self._lock:
+            if self.reason is None:
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def check(self) -> None:
+        """
+        Raises:
+            GenerationCancelled: If the token was cancelled.
+        """
+        if self.cancelled:
+            raise GenerationCancelled(self.reason)
+
+    def _remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+_current_token: ContextVar[Optional[CancelToken]] = ContextVar("current_cancel_token", default=None)
+
+def current_cancel_token() -> Optional[CancelToken]:
+    """The cancel token of the request being handled, if any"""
+    return _current_token.get()
+
+@contextmanager
+def cancel_scope(token: CancelToken) -> Iterator[CancelToken]:
+    """Make ``token`` the cancel token of the code in the ``with`` block"""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+async def run_until_cancelled(awaitable: Awaitable[T], token: CancelToken) -> T:
+    """
+    Await ``awaitable``, cancelling it as soon as the token is cancelled.
+
+    Raises:
+        GenerationCancelled: If the token was cancelled or its deadline passed first.
+    """
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(awaitable)
+    # Tokens can be cancelled from any thread
+    remove_callback = token.add_callback(lambda: loop.call_soon_threadsafe(task.cancel))
+    remaining = token.remaining()
+    timer = loop.call_later(remaining, token.expire) if remaining is not None else None
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if token.cancelled:
+            raise GenerationCancelled(token.reason) from None
+        raise
+    finally:
+        remove_callback()
+        if timer is not None:
+            timer.cancel()
@@ -3,43 +3,89 @@
 Claude API generator for dataset generation
 """
 
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any
 import anthropic
 
 from ..config.settings import CLAUDE_MODEL
 
 from ..models.request import GenerationRequest
 from .base import DatasetGenerator
+from .client_pool import AsyncClientPool
+from ..monitoring.tracing import span
+
+# Async clients are shared across requests so keep-alive connections are reused
+# Retries are left to the shared rate limiter so 429s pause every caller
+_client_pool = AsyncClientPool(lambda api_key: anthropic.AsyncAnthropic(api_key=api_key, max_retries=0))
 
 class ClaudeGenerator(DatasetGenerator):
     """Claude API generator"""
+
+    max_output_tokens = 15000
     
     def __init__(self):
         self.model_name = CLAUDE_MODEL
 
     async def generate_dataset(self, request: GenerationRequest) -> List[Dict[str, Any]]:
         """Generate dataset using Claude API"""
-        if not request.api_key:
-            raise ValueError("API key is required for Claude generator")
-        
-        client = anthropic.Anthropic(api_key=request.api_key)
-        
-        system_prompt = self._create_generation_prompt(request)
+        client = self._get_client(request)
+        params = self._message_params(request)
+        estimated_tokens = self._estimate_request_tokens(request, params["messages"][0]["content"])
         
         try:
-            message = client.messages.create(
-                model=self.model_name,
-                max_tokens=15000,
-                temperature=0.7,
-                system="You are a helpful assistant that generates structured JSON datasets. Always return valid JSON.",
-                messages=[
-                    {"role": "user", "content": system_prompt}
-                ],
-                stream=False
+            message = await self._call_rate_limited(
+                request, estimated_tokens, lambda: client.messages.create(**params, stream=False)
             )
+            self._settle_usage(request, estimated_tokens, message.usage.input_tokens, message.usage.output_tokens)
             
             content = message.content[0].text.strip()
             return self._extract_json_from_response(content)
             
         except Exception as e:
-            raise Exception(f"Claude API error: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Claude API error: {str(e)}")
+
+    async def _stream_completion(self, request: GenerationRequest) -> AsyncIterator[str]:
+        """Stream completion text from Claude API"""
+        client = self._get_client(request)
+        params = self._message_params(request)
+        estimated_tokens = self._estimate_request_tokens(request, params["messages"][0]["content"])
+        input_tokens = output_tokens = 0
+        
+        try:
+            stream = await self._call_rate_limited(
+                request, estimated_tokens, lambda: client.messages.create(**params, stream=True)
+            )
+            
+            async for event in stream:
+                if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    yield event.delta.text
+                elif event.type == "message_start":
+                    input_tokens = event.message.usage.input_tokens
+                elif event.type == "message_delta":
+                    output_tokens = event.usage.output_tokens
+            
+            self._settle_usage(request, estimated_tokens, input_tokens, output_tokens)
+                    
+        except Exception as e:
+            raise Exception(f"Claude API error: {str(e)}")
+
+    def _get_client(self, request: GenerationRequest) -> anthropic.AsyncAnthropic:
+        """Get the pooled client for the request's API key"""
+        if not request.api_key:
+            raise ValueError("API key is required for Claude generator")
+        
+        return _client_pool.get(request.api_key)
+
+    def _message_params(self, request: GenerationRequest) -> Dict[str, Any]:
+        """Build the Messages API parameters for a request"""
+        with span("prompt_build"):
+            system_prompt = self._create_generation_prompt(request)
+        
+        return dict(
+            model=self.model_name,
+            max_tokens=self.output_token_limit(request),
+            temperature=self.sampling_temperature(request),
+            system="You are a helpful assistant that generates structured JSON datasets. Always return valid JSON.",
+            messages=[
+                {"role": "user", "content": system_prompt}
+            ]
+        )
@@ -0,0 +1,40 @@
+"""
+Pool of async API clients shared across requests
+"""
+
+import asyncio
+import hashlib
+import threading
+import weakref
+from typing import Any, Callable, Dict
+
+class AsyncClientPool:
+    """
+    Caches one async API client per API key.
+
+    Async HTTP clients keep their keep-alive connections bound to the event loop
+    they were first used on, so clients are cached per running loop as well.
+    Clients belonging to a loop that has been garbage collected are dropped
+    together with it.
+    """
+
+    def __init__(self, client_factory: Callable[[str], Any]):
+        self._client_factory = client_factory
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, api_key: str) -> Any:
+        """Return the pooled client for an API key, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        # Avoid keeping raw API keys around as dictionary keys
+        key_digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+        with self._lock:
+            clients = self._clients.setdefault(loop, {})
+            client = clients.get(key_digest)
+            if client is None:
+                client = self._client_factory(api_key)
+                clients[key_digest] = client
+            return client
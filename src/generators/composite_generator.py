@@ -0,0 +1,196 @@
+"""
+Generator spreading batches across several providers, with hedged requests
+"""
+
+import asyncio
+import dataclasses
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .base import DatasetGenerator
+from .factory import GeneratorFactory
+from .registry import generator_registry
+from ..models.request import GenerationRequest
+from ..config.settings import (
+    HEDGE_ENABLED,
+    HEDGE_HISTORY_SIZE,
+    HEDGE_LATENCY_PERCENTILE,
+    HEDGE_MIN_DELAY_SECONDS,
+    MULTI_PROVIDER_BACKENDS,
+    PROVIDER_API_KEY_ENV_VARS,
+    THROUGHPUT_SMOOTHING
+)
+
+# Latency samples needed before the percentile replaces the minimum hedge delay
+_MIN_HEDGE_SAMPLES = 5
+
+class _BackendStats:
+    """Observed throughput and latency of one backend"""
+
+    def __init__(self):
+        self.throughput: Optional[float] = None  # records per second, smoothed
+        self.in_flight = 0
+        self.latencies: deque = deque(maxlen=HEDGE_HISTORY_SIZE)
+
+    def record(self, records: int, seconds: float) -> None:
+        seconds = max(seconds, 1e-3)
+        self.latencies.append(seconds)
+        self._smooth(records / seconds)
+
+    def record_failure(self) -> None:
+        """A failed batch counts as producing nothing, so the backend drops down the ranking"""
+        self._smooth(0.0)
+
+    def _smooth(self, rate: float) -> None:
+        if self.throughput is None:
+            self.throughput = rate
+        else:
+            self.throughput += THROUGHPUT_SMOOTHING * (rate - self.throughput)
+
+    def hedge_delay(self) -> float:
+        """How long to wait before duplicating a request on another backend"""
+        if len(self.latencies) < _MIN_HEDGE_SAMPLES:
+            return HEDGE_MIN_DELAY_SECONDS
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(HEDGE_LATENCY_PERCENTILE * len(ordered)))
+        return max(HEDGE_MIN_DELAY_SECONDS, ordered[index])
+
+class CompositeGenerator(DatasetGenerator):
+    """
+    Generates each batch on whichever configured backend should finish it first.
+
+    Backends are ranked by their in-flight batches over their observed
+    throughput, so a sharded dataset is split in proportion to how fast each
+    provider has been. A batch still running past the backend's usual latency
+    percentile is duplicated on the next backend and the first answer wins,
+    and a batch that fails is moved to the next backend. Failures count as
+    batches that produced nothing.
+    """
+
+    temperature = None
+
+    def __init__(self, backends: Optional[List[str]] = None):
+        self.backends = list(backends if backends is not None else MULTI_PROVIDER_BACKENDS)
+        if not self.backends:
+            raise ValueError("No backends configured for the multi-provider generator")
+
+        self.model_name = " + ".join(self.backends)
+        # Batches must fit every backend's output limit
+        self.max_output_tokens = min(
+            GeneratorFactory.get_generator_class(backend).max_output_tokens for backend in self.backends
+        )
+        self._stats = {backend: _BackendStats() for backend in self.backends}
+
+    async def generate_dataset(self, request: GenerationRequest) -> List[Dict[str, Any]]:
+        """Generate one batch on the best backend, hedging it if it runs long and failing over if it fails"""
+        ranked = deque(self._rank(self._backend_requests(request)))
+        started: Dict["asyncio.Task[List[Dict[str, Any]]]", Tuple[str, float]] = {}
+
+        def start_next() -> "asyncio.Task[List[Dict[str, Any]]]":
+            backend, backend_request = ranked.popleft()
+            task = self._start(backend, backend_request)
+            started[task] = (backend, time.monotonic())
+            return task
+
+        primary = start_next()
+        pending = {primary}
+        try:
+            if HEDGE_ENABLED and ranked:
+                done, _ = await asyncio.wait(pending, timeout=self._stats[started[primary][0]].hedge_delay())
+                if not done:
+                    pending.add(start_next())
+            return await self._first_result(pending, started, start_next, ranked)
+        finally:
+            for task in started:
+                task.cancel()
+
+    def settings_fingerprint(self) -> Dict[str, Any]:
+        """Generator settings that influence the generated output"""
+        return {
+            "generator": type(self).__name__,
+            "backends": self.backends,
+            "max_output_tokens": self.output_token_limit(),
+        }
+
+    def _backend_requests(self, request: GenerationRequest) -> List[Tuple[str, GenerationRequest]]:
+        """Sub-requests for every backend that has the credentials it needs"""
+        candidates = []
+        for backend in self.backends:
+            api_key = None
+            if GeneratorFactory.requires_api_key(backend):
+                api_key = os.environ.get(PROVIDER_API_KEY_ENV_VARS.get(backend, ""))
+                if not api_key:
+                    continue
+            candidates.append((backend, dataclasses.replace(request, model_type=backend, api_key=api_key)))
+
+        if not candidates:
+            raise ValueError(
+                "No multi-provider backend has an API key, set "
+                + " or ".join(PROVIDER_API_KEY_ENV_VARS.get(backend, backend) for backend in self.backends)
+            )
+        return candidates
+
+    def _rank(self, candidates: List[Tuple[str, GenerationRequest]]) -> List[Tuple[str, GenerationRequest]]:
+        """Order backends by when they are expected to finish one more batch"""
+        known = [stats.throughput for stats in self._stats.values() if stats.throughput]
+        # Untried backends are assumed to be as fast as the best one so they get a chance
+        default_throughput = max(known) if known else 1.0
+
+        def expected_finish(candidate: Tuple[str, GenerationRequest]) -> float:
+            stats = self._stats[candidate[0]]
+            throughput = default_throughput if stats.throughput is None else stats.throughput
+            # Backends that only failed lately go last
+            return (stats.in_flight + 1) / throughput if throughput else float("inf")
+
+        return sorted(candidates, key=expected_finish)
+
+    def _start(self, backend: str, request: GenerationRequest) -> "asyncio.Task[List[Dict[str, Any]]]":
+        """Dispatch a batch to a backend, counting it as in flight right away"""
+        stats = self._stats[backend]
+        stats.in_flight += 1
+        task = asyncio.ensure_future(self._run(backend, request))
+        task.add_done_callback(lambda _: setattr(stats, "in_flight", stats.in_flight - 1))
+        return task
+
+    async def _run(self, backend: str, request: GenerationRequest) -> List[Dict[str, Any]]:
+        started = time.monotonic()
+        try:
+            with generator_registry.acquire(backend) as generator:
+                records = await generator.generate_dataset(request)
+        except Exception:
+            self._stats[backend].record_failure()
+            raise
+        self._stats[backend].record(len(records), time.monotonic() - started)
+        return records
+
+    async def _first_result(
+        self,
+        pending: Set["asyncio.Task[List[Dict[str, Any]]]"],
+        started: Dict["asyncio.Task[List[Dict[str, Any]]]", Tuple[str, float]],
+        start_next: Callable[[], "asyncio.Task[List[Dict[str, Any]]]"],
+        standby: deque
+    ) -> List[Dict[str, Any]]:
+        """
+        Result of the first batch to succeed, or the first error if all of them fail.
+
+        A failed batch is retried on the next backend in ``standby``. Batches
+        still running when another one wins lost the race, which counts against
+        their backend's throughput.
+        """
+        first_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is None:
+                    now = time.monotonic()
+                    for loser in pending:
+                        backend, since = started[loser]
+                        self._stats[backend].record(0, now - since)
+                    return task.result()
+
+                first_error = first_error or (asyncio.CancelledError() if task.cancelled() else task.exception())
+                if standby:
+                    pending.add(start_next())
+        raise first_error
@@ -2,39 +2,69 @@
 Factory for creating dataset generators
 """
 
+import importlib
+from dataclasses import dataclass
+from typing import Dict, Type
+
 from .base import DatasetGenerator
-from .local_generator import LocalModelGenerator
-from .openai_generator import OpenAIGenerator
-from .claude_generator import ClaudeGenerator
 from ..config.settings import MODEL_TYPES
 
+@dataclass(frozen=True)
+class GeneratorSpec:
+    """Where to find a generator backend and how it is used"""
+    module: str
+    class_name: str
+    requires_api_key: bool = False
+
 class GeneratorFactory:
-    """Factory for creating appropriate generators"""
-    
-    @staticmethod
-    def create_generator(model_type: str) -> DatasetGenerator:
-        """Create a generator instance based on model type"""
-        generators = {
-            MODEL_TYPES.LOCAL: LocalModelGenerator(),
-            MODEL_TYPES.OPENAI: OpenAIGenerator(),
-            MODEL_TYPES.CLAUDE: ClaudeGenerator()
-        }
-        
-        if model_type not in generators:
+    """
+    Factory for creating appropriate generators
+
+    Backends are registered by module path and only imported when a model type
+    is first selected, so heavy dependencies (torch, transformers, provider
+    SDKs) are never loaded for backends that aren't used.
+    """
+
+    _specs: Dict[str, GeneratorSpec] = {
+        MODEL_TYPES.LOCAL: GeneratorSpec(f"{__package__}.local_generator", "LocalModelGenerator"),
+        MODEL_TYPES.OPENAI: GeneratorSpec(f"{__package__}.openai_generator", "OpenAIGenerator", requires_api_key=True),
+        MODEL_TYPES.CLAUDE: GeneratorSpec(f"{__package__}.claude_generator", "ClaudeGenerator", requires_api_key=True),
+        # Backends pick up their keys from the environment, see PROVIDER_API_KEY_ENV_VARS
+        MODEL_TYPES.MULTI: GeneratorSpec(f"{__package__}.composite_generator", "CompositeGenerator"),
+    }
+    _classes: Dict[str, Type[DatasetGenerator]] = {}
+
+    @classmethod
+    def register_generator(cls, model_type: str, spec: GeneratorSpec) -> None:
+        """Register (or replace) the backend used for a model type"""
+        cls._specs[model_type] = spec
+        cls._classes.pop(model_type, None)
+
+    @classmethod
+    def get_generator_class(cls, model_type: str) -> Type[DatasetGenerator]:
+        """Import the backend module for a model type on first use"""
+        if model_type not in cls._specs:
             raise ValueError(f"Unknown model type: {model_type}")
-        
-        return generators[model_type]
-    
-    @staticmethod
-    def get_available_models() -> list[str]:
+
+        if model_type not in cls._classes:
+            spec = cls._specs[model_type]
+            module = importlib.import_module(spec.module)
+            cls._classes[model_type] = getattr(module, spec.class_name)
+
+        return cls._classes[model_type]
+
+    @classmethod
+    def create_generator(cls, model_type: str) -> DatasetGenerator:
+        """Create a generator instance based on model type"""
+        return cls.get_generator_class(model_type)()
+
+    @classmethod
+    def get_available_models(cls) -> list[str]:
         """Get list of available model types"""
-        return [
-            MODEL_TYPES.LOCAL,
-            MODEL_TYPES.OPENAI,
-            MODEL_TYPES.CLAUDE
-        ]
-        
-    @staticmethod
-    def requires_api_key(model_type: str) -> bool:
+        return list(cls._specs)
+
+    @classmethod
+    def requires_api_key(cls, model_type: str) -> bool:
         """Check if model type requires API key"""
-        return model_type in [MODEL_TYPES.OPENAI, MODEL_TYPES.CLAUDE]
\ No newline at end of file
+        spec = cls._specs.get(model_type)
+        return spec is not None and spec.requires_api_key
@@ -2,77 +2,285 @@
 Local Llama model generator with 4-bit quantization
 """
 
-from typing import List, Dict, Any
+import asyncio
+import copy
+import gc
+import threading
+from typing import AsyncIterator, Callable, List, Dict, Any, Optional, Tuple
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
+from transformers import (
+    AutoTokenizer, 
+    AutoModelForCausalLM, 
+    BitsAndBytesConfig, 
+    DynamicCache, 
+    StoppingCriteria, 
+    StoppingCriteriaList, 
+    TextIteratorStreamer
+)
 
 from ..models.request import GenerationRequest
 from .base import DatasetGenerator
-from ..config.settings import LLAMA_MODEL
+from .batching import MicroBatchScheduler
+from .cancellation import CancelToken, current_cancel_token
+from .prefix_cache import PrefixKVCache
+from ..monitoring.metrics import PREFIX_CACHE_TOKENS
+from ..monitoring.tracing import add_tokens, span
+from ..config.settings import LLAMA_MODEL, LOCAL_BATCH_WINDOW_MS, LOCAL_MAX_BATCH_SIZE, LOCAL_PREFIX_CACHE_ENABLED
+
+class _StopRows(StoppingCriteria):
+    """Stops each row of a batch once its check returns True, e.g. when its request is cancelled"""
+
+    def __init__(self, checks: List[Callable[[], bool]]):
+        self.checks = checks
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.tensor([check() for check in self.checks], dtype=torch.bool, device=input_ids.device)
+
+def _is_cancelled(token: Optional[CancelToken]) -> bool:
+    return token is not None and token.cancelled
 
 class LocalModelGenerator(DatasetGenerator):
     """Local Llama model generator with 4-bit quantization"""
 
+    max_output_tokens = 8192
+
     def __init__(self):
         self.model = None
         self.tokenizer = None
         self.model_name = LLAMA_MODEL
+        # Concurrent generate_dataset calls share a single padded batch on the GPU
+        self._batcher = MicroBatchScheduler(self._generate_batch, LOCAL_MAX_BATCH_SIZE, LOCAL_BATCH_WINDOW_MS)
+        # Shared prompt prefixes are encoded once and reused by later requests
+        self._prefix_cache = PrefixKVCache(self.model_name) if LOCAL_PREFIX_CACHE_ENABLED else None
 
     def _load_model(self):
         """Load the model with 4-bit quantization if not already loaded"""
         if self.model is None:
-            quantization_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_compute_dtype=torch.float16,
-                bnb_4bit_quant_type="nf4",
-                bnb_4bit_use_double_quant=True,
-            )
-            
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_name,
-                quantization_config=quantization_config,
-                device_map="auto",
-                torch_dtype=torch.float16,
-            )
-            
-            if self.tokenizer.pad_token is None:
-                self.tokenizer.pad_token = self.tokenizer.eos_token
+            with span("model_load"):
+                quantization_config = BitsAndBytesConfig(
+                    load_in_4bit=True,
+                    bnb_4bit_compute_dtype=torch.float16,
+                    bnb_4bit_quant_type="nf4",
+                    bnb_4bit_use_double_quant=True,
+                )
+                
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_name,
+                    quantization_config=quantization_config,
+                    device_map="auto",
+                    torch_dtype=torch.float16,
+                )
+                
+                if self.tokenizer.pad_token is None:
+                    self.tokenizer.pad_token = self.tokenizer.eos_token
+
+    def warmup(self) -> None:
+        """Load the model weights ahead of the first request"""
+        self._load_model()
+
+    def unload(self) -> None:
+        """Drop the model weights and free the GPU memory they occupied"""
+        if self.model is None:
+            return
+        
+        self.model = None
+        self.tokenizer = None
+        if self._prefix_cache is not None:
+            self._prefix_cache.clear()
+        gc.collect()
+        
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
     
     async def generate_dataset(self, request: GenerationRequest) -> List[Dict[str, Any]]:
         """Generate dataset using local Llama model"""
-        self._load_model()
+        messages = self._build_messages(request)
+        token = current_cancel_token()
+        
+        # Batched with other pending requests and run in a worker thread
+        response = await self._batcher.submit((messages, token, self.output_token_limit(request)))
+        if token is not None:
+            # A cancelled row stops early, don't parse what it left behind
+            token.check()
+        self._record_tokens(messages, response)
         
-        system_prompt = self._create_generation_prompt(request)
+        return self._extract_json_from_response(response)
+
+    async def _stream_completion(self, request: GenerationRequest) -> AsyncIterator[str]:
+        """Stream completion text from the local model as tokens are decoded"""
+        # Streaming can't share a batch, so take the GPU for the whole generation
+        async with self._batcher.exclusive():
+            await asyncio.to_thread(self._load_model)
+            
+            inputs = self._prepare_inputs(self._build_messages(request))
+            past_key_values = await asyncio.to_thread(self._cached_prefix, inputs)
+            streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+            
+            # Stop decoding when the request is cancelled or the consumer goes away
+            token = current_cancel_token()
+            stopped = threading.Event()
+            stop = _StopRows([lambda: stopped.is_set() or _is_cancelled(token)])
+            
+            errors: List[BaseException] = []
+            
+            def run_generation() -> None:
+                try:
+                    with torch.no_grad():
+                        self.model.generate(
+                            inputs, 
+                            streamer=streamer, 
+                            past_key_values=past_key_values, 
+                            stopping_criteria=StoppingCriteriaList([stop]),
+                            **self._generation_kwargs(self.output_token_limit(request), self.sampling_temperature(request))
+                        )
+                except BaseException as e:
+                    errors.append(e)
+                    # Unblock the consumer, the streamer is only closed on success
+                    streamer.end()
+            
+            worker = threading.Thread(target=run_generation, daemon=True)
+            worker.start()
+            
+            # The streamer blocks until the next piece of text is decoded
+            pieces = []
+            try:
+                while True:
+                    text = await asyncio.to_thread(next, streamer, None)
+                    if text is None:
+                        break
+                    pieces.append(text)
+                    yield text
+            finally:
+                # Keep the GPU until generation has actually stopped, one decoding step at most
+                stopped.set()
+                await asyncio.to_thread(worker.join)
+            
+            if errors:
+                raise errors[0]
+            if token is not None:
+                token.check()
+            add_tokens(inputs.shape[-1], len(self.tokenizer.encode("".join(pieces), add_special_tokens=False)))
+
+    def _build_messages(self, request: GenerationRequest) -> List[Dict[str, str]]:
+        """Build the chat conversation for a request"""
+        with span("prompt_build"):
+            system_prompt = self._create_generation_prompt(request)
         
-        messages = [
+        return [
             {"role": "system", "content": "You are a helpful assistant that generates structured JSON datasets."},
             {"role": "user", "content": system_prompt}
         ]
-        
+
+    def _prepare_inputs(self, messages: List[Dict[str, str]]) -> torch.Tensor:
+        """Tokenize a chat conversation onto the model's device"""
         inputs = self.tokenizer.apply_chat_template(
             messages, 
             return_tensors="pt", 
-            add_generation_token=True
+            add_generation_prompt=True
         )
         
-        inputs = inputs.to(self.model.device)
+        return inputs.to(self.model.device)
+
+    def _cached_prefix(self, input_ids: torch.Tensor) -> Optional[DynamicCache]:
+        """
+        Key/value state for the reusable prefix of a single prompt
+        
+        The longest cached prefix is reused. Whole blocks beyond it are encoded
+        and cached as well, so later prompts sharing them skip that work.
+        """
+        if self._prefix_cache is None:
+            return None
+        
+        token_ids = input_ids[0].tolist()
+        target = self._prefix_cache.reusable_length(len(token_ids))
+        past_key_values, length = self._prefix_cache.lookup(token_ids)
+        PREFIX_CACHE_TOKENS.inc(length, result="reused")
+        
+        if length < target:
+            with span("prefill"), torch.no_grad():
+                if past_key_values is None:
+                    past_key_values = DynamicCache()
+                self.model(input_ids[:, length:target], past_key_values=past_key_values, use_cache=True)
+            PREFIX_CACHE_TOKENS.inc(target - length, result="encoded")
+            
+            self._prefix_cache.put(token_ids[:target], past_key_values)
+            # Generation extends the cache it gets, keep the stored one intact
+            past_key_values = copy.deepcopy(past_key_values)
+        
+        return past_key_values
+
+    def _cached_batch_prefix(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> Optional[DynamicCache]:
+        """Key/value state for the prefix shared by every prompt of a batch"""
+        # Padding shifts prompts against each other, only equal lengths can share a cache
+        if self._prefix_cache is None or not bool(attention_mask.all()):
+            return None
+        
+        # Batches of one request's shards usually share everything but the record count
+        mismatches = (input_ids != input_ids[:1]).any(dim=0).nonzero()
+        shared = int(mismatches[0]) if len(mismatches) else input_ids.shape[1]
+        
+        past_key_values = self._cached_prefix(input_ids[:1, :min(shared + 1, input_ids.shape[1])])
+        if past_key_values is not None and input_ids.shape[0] > 1:
+            past_key_values.batch_repeat_interleave(input_ids.shape[0])
+        return past_key_values
+
+    def _record_tokens(self, messages: List[Dict[str, str]], completion: str) -> None:
+        """Count the tokens of a batched generation for tracing"""
+        prompt = "".join(message["content"] for message in messages)
+        add_tokens(
+            len(self.tokenizer.encode(prompt, add_special_tokens=False)),
+            len(self.tokenizer.encode(completion, add_special_tokens=False))
+        )
+
+    def _generation_kwargs(self, max_new_tokens: int, temperature: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Sampling parameters shared by all generation paths
+        
+        Rows of a batch are sampled together, so batches always use the
+        generator's temperature and only streamed requests can override it.
+        """
+        return dict(
+            temperature=self.temperature if temperature is None else temperature,
+            max_new_tokens=max_new_tokens,
+            do_sample=True,
+            pad_token_id=self.tokenizer.eos_token_id,
+        )
+
+    def _generate_batch(self, items: List[Tuple[List[Dict[str, str]], Optional[CancelToken], int]]) -> List[str]:
+        """Run blocking inference for several conversations in one padded batch"""
+        self._load_model()
+        conversations = [messages for messages, _, _ in items]
+        # Cancelled rows stop decoding, the batch ends once every row has
+        stop = _StopRows([lambda token=token: _is_cancelled(token) for _, token, _ in items])
+        
+        prompts = [
+            self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+            for messages in conversations
+        ]
+        
+        # Left padding keeps every prompt adjacent to its generated tokens
+        self.tokenizer.padding_side = "left"
+        inputs = self.tokenizer(
+            prompts,
+            return_tensors="pt",
+            padding=True,
+            add_special_tokens=False  # the chat template already adds them
+        ).to(self.model.device)
         
         with torch.no_grad():
             outputs = self.model.generate(
-                inputs,
-                temperature=0.7,
-                max_new_tokens=8192,
-                do_sample=True,
-                pad_token_id=self.tokenizer.eos_token_id,
+                **inputs,
+                past_key_values=self._cached_batch_prefix(inputs["input_ids"], inputs["attention_mask"]),
                 return_dict_in_generate=True,
+                stopping_criteria=StoppingCriteriaList([stop]),
+                # Rows finish at their end of sequence, the largest budget bounds the batch
+                **self._generation_kwargs(max(max_new_tokens for _, _, max_new_tokens in items))
             )
         
-        # Decode only the generated tokens (excluding the prompt)
-        generated_tokens = outputs.sequences[0][inputs.shape[1]:]
-        response = self.tokenizer.decode(
-            generated_tokens,
+        # Decode only the generated tokens (excluding the padded prompts)
+        prompt_length = inputs["input_ids"].shape[1]
+        return self.tokenizer.batch_decode(
+            outputs.sequences[:, prompt_length:],
             skip_special_tokens=True
         )
-        
-        return self._extract_json_from_response(response)
\ No newline at end of file
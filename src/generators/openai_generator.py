@@ -1,36 +1,88 @@
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any
 import openai
 
 from ..config.settings import OPEN_MODEL
 
 from ..models.request import GenerationRequest
 from .base import DatasetGenerator
+from .client_pool import AsyncClientPool
+from ..monitoring.tracing import span
+
+# Async clients are shared across requests so keep-alive connections are reused
+# Retries are left to the shared rate limiter so 429s pause every caller
+_client_pool = AsyncClientPool(lambda api_key: openai.AsyncOpenAI(api_key=api_key, max_retries=0))
 
 class OpenAIGenerator(DatasetGenerator):
     """OpenAI API based dataset generator"""
 
+    max_output_tokens = 100000
+    # Reasoning models only support the default temperature
+    temperature = None
+
     def __init__(self):
         self.model_name = OPEN_MODEL
 
     async def generate_dataset(self, request: GenerationRequest) -> List[Dict[str, Any]]:
         """Generate dataset using OpenAI API"""
-        if not request.api_key:
-            raise ValueError("API key is required for OpenAI generator")
-        
-        client = openai.OpenAI(api_key=request.api_key)
-        
-        system_prompt = self._create_generation_prompt(request)
+        client = self._get_client(request)
+        params = self._completion_params(request)
+        estimated_tokens = self._estimate_request_tokens(request, params["messages"][1]["content"])
 
         try:
-            response = client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that generates structured JSON datasets. Always return valid JSON"},
-                    {"role": "user", "content": system_prompt}
-                ],
-                max_completion_tokens=100000
+            response = await self._call_rate_limited(
+                request, estimated_tokens, lambda: client.chat.completions.create(**params)
+            )
+            self._settle_usage(
+                request, estimated_tokens, response.usage.prompt_tokens, response.usage.completion_tokens
             )
+            
             content = response.choices[0].message.content.strip()
             return self._extract_json_from_response(content)
         except Exception as e:
-            raise Exception(f"OpenAI API error: {str(e)}")
\ No newline at end of file
+            raise Exception(f"OpenAI API error: {str(e)}")
+
+    async def _stream_completion(self, request: GenerationRequest) -> AsyncIterator[str]:
+        """Stream completion text from OpenAI API"""
+        client = self._get_client(request)
+        params = self._completion_params(request)
+        estimated_tokens = self._estimate_request_tokens(request, params["messages"][1]["content"])
+
+        try:
+            stream = await self._call_rate_limited(
+                request, 
+                estimated_tokens, 
+                lambda: client.chat.completions.create(**params, stream=True, stream_options={"include_usage": True})
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if chunk.usage is not None:
+                    self._settle_usage(
+                        request, estimated_tokens, chunk.usage.prompt_tokens, chunk.usage.completion_tokens
+                    )
+        except Exception as e:
+            raise Exception(f"OpenAI API error: {str(e)}")
+
+    def _get_client(self, request: GenerationRequest) -> openai.AsyncOpenAI:
+        """Get the pooled client for the request's API key"""
+        if not request.api_key:
+            raise ValueError("API key is required for OpenAI generator")
+        
+        return _client_pool.get(request.api_key)
+
+    def _completion_params(self, request: GenerationRequest) -> Dict[str, Any]:
+        """Build the Chat Completions API parameters for a request"""
+        with span("prompt_build"):
+            system_prompt = self._create_generation_prompt(request)
+
+        params = dict(
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that generates structured JSON datasets. Always return valid JSON"},
+                {"role": "user", "content": system_prompt}
+            ],
+            max_completion_tokens=self.output_token_limit(request)
+        )
+        if request.seed is not None:
+            params["seed"] = request.seed
+        return params
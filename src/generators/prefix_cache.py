@@ -0,0 +1,129 @@
+"""
+Attention key/value state cached for prompt prefixes shared between requests
+"""
+
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..config.settings import LOCAL_PREFIX_BLOCK_TOKENS, LOCAL_PREFIX_CACHE_MAX_MB
+
+def kv_nbytes(kv: Any) -> int:
+    """Memory held by the key and value tensors of a transformers cache"""
+    layers = getattr(kv, "layers", None)
+    if layers is not None:
+        # transformers 4.56 and later keep tensors per layer
+        tensors = [tensor for layer in layers for tensor in (layer.keys, layer.values)]
+    else:
+        tensors = [*kv.key_cache, *kv.value_cache]
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors if tensor is not None)
+
+@dataclass
+class _Entry:
+    kv: Any
+    length: int
+    nbytes: int
+    block_hashes: List[str]
+
+class PrefixKVCache:
+    """
+    Least recently used cache of prompt prefix key/value state, bounded by memory.
+
+    Prompts are hashed in blocks of ``block_tokens`` tokens, each hash
+    covering every block before it. A lookup finds the longest cached prefix
+    a prompt starts with, even if the cached prompt went on differently.
+    Hashes include the tokenizer name, so IDs from different vocabularies
+    never match.
+    """
+
+    def __init__(
+        self,
+        tokenizer_name: str,
+        max_bytes: int = LOCAL_PREFIX_CACHE_MAX_MB * 1024 * 1024,
+        block_tokens: int = LOCAL_PREFIX_BLOCK_TOKENS
+    ):
+        self.tokenizer_name = tokenizer_name
+        self.max_bytes = max_bytes
+        self.block_tokens = block_tokens
+        self.nbytes = 0
+        # Entries by the hash of their last block, and every block hash to an entry containing it
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._index: Dict[str, Tuple[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def reusable_length(self, num_tokens: int) -> int:
+        """Longest prefix of a prompt that can be cached, in whole blocks"""
+        # Generation needs at least one prompt token that isn't cached
+        return (num_tokens - 1) // self.block_tokens * self.block_tokens
+
+    def lookup(self, token_ids: Sequence[int]) -> Tuple[Optional[Any], int]:
+        """
+        The longest cached prefix of a prompt and its length in tokens.
+
+        Generation extends the cache it is given, so callers get a private
+        copy. Returns (None, 0) on a miss.
+        """
+        hashes = self._block_hashes(token_ids[:self.reusable_length(len(token_ids))])
+        with self._lock:
+            for block_hash in reversed(hashes):
+                if block_hash in self._index:
+                    key, length = self._index[block_hash]
+                    entry = self._entries[key]
+                    self._entries.move_to_end(key)
+                    break
+            else:
+                return None, 0
+
+        kv = copy.deepcopy(entry.kv)
+        if length < entry.length:
+            kv.crop(length)
+        return kv, length
+
+    def put(self, token_ids: Sequence[int], kv: Any) -> None:
+        """Cache the key/value state of a prefix made of whole blocks"""
+        hashes = self._block_hashes(token_ids)
+        nbytes = kv_nbytes(kv)
+        if not hashes or len(token_ids) % self.block_tokens or nbytes > self.max_bytes:
+            return
+
+        key = hashes[-1]
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+
+            self._entries[key] = _Entry(kv, len(token_ids), nbytes, hashes)
+            self.nbytes += nbytes
+            self._add_to_index(key, hashes)
+
+            if self.nbytes > self.max_bytes:
+                while self.nbytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.nbytes -= evicted.nbytes
+                # Blocks of evicted entries may still be held by others
+                self._index.clear()
+                for entry_key, entry in self._entries.items():
+                    self._add_to_index(entry_key, entry.block_hashes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+            self.nbytes = 0
+
+    def _add_to_index(self, key: str, hashes: List[str]) -> None:
+        for i, block_hash in enumerate(hashes):
+            self._index[block_hash] = (key, (i + 1) * self.block_tokens)
+
+    def _block_hashes(self, token_ids: Sequence[int]) -> List[str]:
+        """Hash of each complete block of tokens together with the blocks before it"""
+        digest = hashlib.sha256(self.tokenizer_name.encode("utf-8"))
+        hashes = []
+        for end in range(self.block_tokens, len(token_ids) + 1, self.block_tokens):
+            block = token_ids[end - self.block_tokens:end]
+            digest.update(",".join(map(str, block)).encode("ascii") + b";")
+            hashes.append(digest.copy().hexdigest())
+        return hashes
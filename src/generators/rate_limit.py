@@ -0,0 +1,118 @@
+"""
+Client-side rate limiting for provider APIs
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from ..config.settings import RATE_LIMITS
+
+class TokenBucket:
+    """Continuously refilling bucket; amounts above the capacity are clamped"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.refill_rate = per_minute / 60
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` is available (call after refill)"""
+        deficit = min(amount, self.capacity) - self.tokens
+        return max(0.0, deficit / self.refill_rate)
+
+class ProviderRateLimiter:
+    """
+    Paces requests to stay under a provider's requests- and tokens-per-minute quota.
+
+    Each call reserves one request plus its estimated token cost before it is
+    dispatched, waiting as long as needed. Reservations can be corrected once
+    the actual usage is known, and a Retry-After from the provider pauses all
+    dispatch through the limiter.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until a request costing ``tokens`` can be sent, then reserve it"""
+        while True:
+            wait = self._try_reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct a reservation with the usage the provider reported"""
+        with self._lock:
+            self._tokens.tokens += estimated - actual
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all dispatch for a while, e.g. after a 429 with Retry-After"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _try_reserve(self, tokens: int) -> float:
+        """Reserve capacity if available, otherwise return how long to wait"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            wait = max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+            if wait > 0:
+                return wait
+
+            self._requests.tokens -= 1
+            self._tokens.tokens -= min(tokens, self._tokens.capacity)
+            return 0.0
+
+_limiters: Dict[Tuple[str, str], ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(model_type: str, api_key: Optional[str]) -> Optional[ProviderRateLimiter]:
+    """The shared limiter for a provider and API key, or None if it isn't rate limited"""
+    limits = RATE_LIMITS.get(model_type)
+    if limits is None:
+        return None
+
+    # Quotas are per key, but raw keys shouldn't be kept around
+    key = (model_type, hashlib.sha256((api_key or "").encode("utf-8")).hexdigest())
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = ProviderRateLimiter(limits["requests_per_minute"], limits["tokens_per_minute"])
+        return _limiters[key]
+
+def parse_retry_after(error: Exception) -> Optional[float]:
+    """
+    Seconds to wait according to a provider's 429 response.
+
+    Returns None if the error is not a rate limit error. Rate limit errors
+    without a usable Retry-After header yield 0.
+    """
+    if getattr(error, "status_code", None) != 429:
+        return None
+
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for header, scale in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value is not None:
+            try:
+                return max(0.0, float(value) / scale)
+            except ValueError:
+                # HTTP-date form, fall back to the caller's backoff
+                pass
+    return 0.0
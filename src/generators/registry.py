@@ -0,0 +1,116 @@
+"""
+Process-wide registry of generator instances
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .base import DatasetGenerator
+from .factory import GeneratorFactory
+from ..monitoring.tracing import span
+from ..config.settings import GENERATOR_IDLE_TIMEOUT_MINUTES
+
+@dataclass
+class _RegistryEntry:
+    """A cached generator together with its usage bookkeeping"""
+    generator: DatasetGenerator
+    ref_count: int = 0
+    last_used: float = 0.0
+
+class GeneratorRegistry:
+    """
+    Keeps one generator instance per model type for the lifetime of the process.
+
+    Generators are constructed lazily on first use, can be warmed up explicitly
+    at startup and are unloaded once they have been idle for longer than the
+    configured timeout. Generators that are currently in use are never evicted.
+    """
+
+    def __init__(self, idle_timeout_minutes: float = GENERATOR_IDLE_TIMEOUT_MINUTES):
+        self.idle_timeout = idle_timeout_minutes * 60
+        self._entries: Dict[str, _RegistryEntry] = {}
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+
+    def _get_entry(self, model_type: str) -> _RegistryEntry:
+        """Return the registry entry for a model type, creating it if needed"""
+        entry = self._entries.get(model_type)
+        if entry is None:
+            with span("model_load"):
+                entry = _RegistryEntry(generator=GeneratorFactory.create_generator(model_type))
+            self._entries[model_type] = entry
+        return entry
+
+    @contextmanager
+    def acquire(self, model_type: str) -> Iterator[DatasetGenerator]:
+        """
+        Borrow the generator for a model type.
+
+        The generator is pinned for the duration of the ``with`` block so that
+        idle eviction cannot unload it mid-generation.
+        """
+        with self._lock:
+            entry = self._get_entry(model_type)
+            entry.ref_count += 1
+            entry.last_used = time.monotonic()
+
+        self._ensure_sweeper()
+
+        try:
+            yield entry.generator
+        finally:
+            with self._lock:
+                entry.ref_count -= 1
+                entry.last_used = time.monotonic()
+
+    def warmup(self, model_types: Iterable[str]) -> None:
+        """Construct and load the generators for the given model types"""
+        for model_type in model_types:
+            with self.acquire(model_type) as generator:
+                generator.warmup()
+
+    def evict_idle(self) -> List[str]:
+        """
+        Unload generators that are not in use and have been idle too long.
+
+        Returns:
+            List[str]: The model types that were evicted.
+        """
+        now = time.monotonic()
+        evicted = []
+
+        with self._lock:
+            for model_type, entry in list(self._entries.items()):
+                if entry.ref_count == 0 and now - entry.last_used >= self.idle_timeout:
+                    del self._entries[model_type]
+                    evicted.append((model_type, entry))
+
+        # Unload outside the lock, freeing weights can take a while
+        for _, entry in evicted:
+            entry.generator.unload()
+
+        return [model_type for model_type, _ in evicted]
+
+    def _ensure_sweeper(self) -> None:
+        """Start the background thread that evicts idle generators"""
+        if self.idle_timeout <= 0 or (self._sweeper is not None and self._sweeper.is_alive()):
+            return
+
+        with self._lock:
+            if self._sweeper is not None and self._sweeper.is_alive():
+                return
+            self._sweeper = threading.Thread(target=self._sweep_forever, name="generator-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_forever(self) -> None:
+        """Periodically evict idle generators"""
+        interval = max(1.0, min(60.0, self.idle_timeout / 4))
+        while True:
+            time.sleep(interval)
+            self.evict_idle()
+
+# Shared registry used by the service layer
+generator_registry = GeneratorRegistry()
@@ -3,7 +3,9 @@ Data models for dataset generation requests
 """
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import DEFAULT_OUTPUT_FORMAT, MAX_RECORDS, OUTPUT_FORMATS
 
 @dataclass
 class GenerationRequest:
@@ -14,13 +16,32 @@ class GenerationRequest:
     num_records: int
     model_type: str
     api_key: Optional[str] = None
+    use_cache: bool = True
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+    compression: Optional[str] = None
+    schema: Optional[Dict[str, Any]] = None  # JSON Schema for records, inferred when omitted
+    dedup_fields: Optional[List[str]] = None  # fields compared for duplicates, all but ids when omitted
+    near_dedup: bool = False  # also drop near-duplicates (MinHash/LSH)
+    timeout_seconds: Optional[float] = None  # deadline for the generation, GENERATION_TIMEOUT_SECONDS when omitted
+    temperature: Optional[float] = None  # overrides the generator's sampling temperature where it can be changed
+    seed: Optional[int] = None  # sampling seed, for providers that support one
+    subtopics: Optional[List[str]] = None  # records are spread across these, set on batches by the planner
+    max_tokens: Optional[int] = None  # output token budget of the completion, set on batches by the shard sizer
     
     def __post_init__(self):
         if not self.prompt.strip():
             raise ValueError("Prompt cannot be empty.")
         if self.num_records <= 0:
             raise ValueError("Number of records must be a positive integer.")
-        if self.num_records > 50:
-            raise ValueError("Number of records cannot exceed 50")
+        if self.num_records > MAX_RECORDS:
+            raise ValueError(f"Number of records cannot exceed {MAX_RECORDS}")
         if not self.model_type:
-            raise ValueError("Model type cannot be empty.")
\ No newline at end of file
+            raise ValueError("Model type cannot be empty.")
+        if self.temperature is not None and self.temperature < 0:
+            raise ValueError("Temperature cannot be negative.")
+        if self.max_tokens is not None and self.max_tokens <= 0:
+            raise ValueError("Max tokens must be a positive integer.")
+        if self.timeout_seconds is not None and self.timeout_seconds <= 0:
+            raise ValueError("Timeout must be a positive number of seconds.")
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Output format must be one of: {', '.join(OUTPUT_FORMATS)}")
\ No newline at end of file
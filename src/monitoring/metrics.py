@@ -0,0 +1,176 @@
+"""
+Prometheus-style metrics for dataset generation
+"""
+
+import bisect
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+class _Metric(ABC):
+    """A named metric with a fixed set of label names"""
+
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _labels(self, key: Tuple[str, ...], *extra: Tuple[str, str]) -> str:
+        return _format_labels(list(zip(self.label_names, key)) + list(extra))
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        yield from self._samples()
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        """Sample lines of every label set"""
+        pass
+
+class Counter(_Metric):
+    """Monotonically increasing total"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{self._labels(key)} {value:g}"
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: bucket counts (the last one is +Inf), sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted((key, list(counts), total[0]) for key, (counts, total) in self._values.items())
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                yield f"{self.name}_bucket{self._labels(key, ('le', le))} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {total:g}"
+            yield f"{self.name}_count{self._labels(key)} {cumulative}"
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in the text exposition format"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+# Shared registry and the metrics recorded for every generation request
+metrics_registry = MetricsRegistry()
+
+REQUESTS = metrics_registry.counter(
+    "dataset_requests_total", "Generation requests by outcome", ("model_type", "status")
+)
+REQUEST_SECONDS = metrics_registry.histogram(
+    "dataset_request_duration_seconds", "End-to-end time per generation request", ("model_type",)
+)
+STAGE_SECONDS = metrics_registry.histogram(
+    "dataset_stage_duration_seconds", "Time per request spent in each stage", ("model_type", "stage")
+)
+STAGE_RECORDS = metrics_registry.counter(
+    "dataset_stage_records_total", "Records handled by each stage", ("model_type", "stage")
+)
+TIME_TO_FIRST_TOKEN = metrics_registry.histogram(
+    "dataset_time_to_first_token_seconds", "Time until a streamed completion starts", ("model_type",)
+)
+TOKENS = metrics_registry.counter(
+    "dataset_tokens_total", "Model tokens used, by direction", ("model_type", "direction")
+)
+PREFIX_CACHE_TOKENS = metrics_registry.counter(
+    "dataset_prefix_cache_tokens_total", "Local model prompt tokens whose key/value state was reused or encoded", ("result",)
+)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = metrics_registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(host: str, port: int) -> ThreadingHTTPServer:
+    """Serve /metrics from a background thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,207 @@
+"""
+Per-request stage timings for dataset generation
+"""
+
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+from ..models.request import GenerationRequest
+from .metrics import REQUEST_SECONDS, REQUESTS, STAGE_RECORDS, STAGE_SECONDS, TIME_TO_FIRST_TOKEN, TOKENS
+from ..config.settings import TRACE_LOG_PATH
+
+@dataclass
+class Span:
+    """
+    Time a request spent in one stage.
+
+    Stages run many times per request (once per batch or per record), so a
+    span aggregates every timed section of its stage.
+    """
+    name: str
+    duration_seconds: float = 0.0
+    count: int = 0
+    records: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def records_per_second(self) -> Optional[float]:
+        if not self.records or self.duration_seconds <= 0:
+            return None
+        return self.records / self.duration_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "duration_seconds": self.duration_seconds,
+            "count": self.count,
+            "records": self.records,
+            "records_per_second": self.records_per_second,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+@dataclass
+class RequestTrace:
+    """Stage spans recorded for one generation request"""
+    trace_id: str
+    model_type: str
+    num_records: int
+    started_at: float = field(default_factory=time.time)
+    duration_seconds: float = 0.0
+    status: str = "ok"
+    records: int = 0
+    spans: Dict[str, Span] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(
+        self, 
+        stage: str, 
+        seconds: float, 
+        records: int = 0, 
+        input_tokens: int = 0, 
+        output_tokens: int = 0,
+        sections: int = 1
+    ) -> None:
+        """Add timed sections to a stage's span"""
+        with self._lock:
+            span = self.spans.get(stage)
+            if span is None:
+                span = self.spans[stage] = Span(stage)
+            span.duration_seconds += seconds
+            span.count += sections
+            span.records += records
+            span.input_tokens += input_tokens
+            span.output_tokens += output_tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "model_type": self.model_type,
+            "num_records": self.num_records,
+            "records": self.records,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_seconds": self.duration_seconds,
+            "records_per_second": self.records / self.duration_seconds if self.duration_seconds > 0 else None,
+            "spans": [span.to_dict() for span in self.spans.values()],
+        }
+
+@dataclass
+class TokenUsage:
+    """Model tokens used inside a ``count_tokens`` block"""
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+_current_usage: ContextVar[Optional[TokenUsage]] = ContextVar("current_usage", default=None)
+_log_lock = threading.Lock()
+
+def current_trace() -> Optional[RequestTrace]:
+    """The trace of the request being handled, if any"""
+    return _current_trace.get()
+
+@contextmanager
+def trace_request(request: GenerationRequest, trace_id: Optional[str] = None) -> Iterator[RequestTrace]:
+    """
+    Collect stage timings for a request inside the ``with`` block.
+
+    Nested calls share the outer trace. The outermost one publishes the
+    trace to the metrics and the JSON trace log when it ends.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        yield trace
+        return
+
+    trace = RequestTrace(
+        trace_id=trace_id or uuid.uuid4().hex, 
+        model_type=request.model_type, 
+        num_records=request.num_records
+    )
+    token = _current_trace.set(trace)
+    started = time.perf_counter()
+    try:
+        yield trace
+    except BaseException:
+        trace.status = "error"
+        raise
+    finally:
+        trace.duration_seconds = time.perf_counter() - started
+        _current_trace.reset(token)
+        _publish(trace)
+
+@contextmanager
+def span(stage: str, records: int = 0) -> Iterator[None]:
+    """Time the ``with`` block as part of a stage of the current request"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(stage, time.perf_counter() - started, records)
+
+@contextmanager
+def count_tokens() -> Iterator[TokenUsage]:
+    """
+    Count the model tokens used inside the ``with`` block, e.g. by one batch.
+
+    Tasks started in the block count toward it too. Blocks don't nest, an
+    inner block hides its tokens from the outer one.
+    """
+    usage = TokenUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+def record_span(stage: str, seconds: float, records: int = 0) -> None:
+    """Add a section timed by the caller to a stage of the current request"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(stage, seconds, records)
+
+def record_time_to_first_token(seconds: float) -> None:
+    """Note how long a streamed completion took to start"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record("time_to_first_token", seconds)
+        TIME_TO_FIRST_TOKEN.observe(seconds, model_type=trace.model_type)
+
+def add_tokens(input_tokens: int = 0, output_tokens: int = 0) -> None:
+    """Attribute model token usage to the generation stage of the current request"""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.input_tokens += input_tokens
+        usage.output_tokens += output_tokens
+
+    trace = _current_trace.get()
+    if trace is not None:
+        # Token reports aren't timed sections of their own
+        trace.record("generation", 0.0, input_tokens=input_tokens, output_tokens=output_tokens, sections=0)
+
+def _publish(trace: RequestTrace) -> None:
+    """Feed a finished trace into the metrics and the trace log"""
+    REQUESTS.inc(model_type=trace.model_type, status=trace.status)
+    REQUEST_SECONDS.observe(trace.duration_seconds, model_type=trace.model_type)
+
+    for stage in list(trace.spans.values()):
+        if stage.name != "time_to_first_token":
+            STAGE_SECONDS.observe(stage.duration_seconds, model_type=trace.model_type, stage=stage.name)
+        if stage.records:
+            STAGE_RECORDS.inc(stage.records, model_type=trace.model_type, stage=stage.name)
+        if stage.input_tokens:
+            TOKENS.inc(stage.input_tokens, model_type=trace.model_type, direction="input")
+        if stage.output_tokens:
+            TOKENS.inc(stage.output_tokens, model_type=trace.model_type, direction="output")
+
+    if TRACE_LOG_PATH:
+        line = json.dumps(trace.to_dict(), ensure_ascii=False)
+        with _log_lock, open(TRACE_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
@@ -0,0 +1,203 @@
+"""
+Headless batch generation from a JSONL file of requests
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from ..models.request import GenerationRequest
+from .dataset_service import DatasetService
+from ..config.settings import BATCH_CONCURRENCY, PROVIDER_API_KEY_ENV_VARS
+
+_REQUEST_FIELDS = {field.name for field in dataclasses.fields(GenerationRequest)}
+
+@dataclass
+class BatchEntry:
+    """One request from a batch file"""
+    key: str
+    line_number: int
+    request: GenerationRequest
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch entry"""
+    key: str
+    filepath: str
+    status: str
+    records: int
+    requested: int
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        """Whether the entry's full dataset was saved, partial datasets still have work left"""
+        return bool(self.filepath) and self.records >= self.requested
+
+@dataclass
+class BatchSummary:
+    """Totals for a batch run"""
+    total: int = 0
+    skipped: int = 0
+    completed: int = 0
+    failed: int = 0
+    records: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+def load_batch_file(path: str) -> List[BatchEntry]:
+    """
+    Read generation requests from a JSONL file.
+
+    Each non-empty line is an object with GenerationRequest fields and an
+    optional ``id``. Entries without an id are keyed by their content, so
+    reordering the file doesn't change which entries count as finished. API
+    keys that aren't given fall back to the provider's environment variable.
+
+    Raises:
+        ValueError: If a line is not a valid request.
+    """
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                if not isinstance(data, dict):
+                    raise ValueError("expected a JSON object")
+                entries.append(_parse_entry(data, line_number))
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"{path}:{line_number}: {e}")
+
+    duplicates = sorted(key for key, count in Counter(entry.key for entry in entries).items() if count > 1)
+    if duplicates:
+        raise ValueError(f"{path}: duplicate entries: {', '.join(duplicates)}")
+    return entries
+
+def _parse_entry(data: Dict[str, Any], line_number: int) -> BatchEntry:
+    fields = {key: value for key, value in data.items() if key != "id"}
+    unknown = sorted(set(fields) - _REQUEST_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+
+    if not fields.get("api_key"):
+        env_var = PROVIDER_API_KEY_ENV_VARS.get(fields.get("model_type", ""))
+        fields["api_key"] = os.environ.get(env_var) if env_var else None
+
+    # Keys identify the work, not the credentials used for it
+    identity = {key: value for key, value in fields.items() if key != "api_key"}
+    key = str(data["id"]) if "id" in data else hashlib.sha256(
+        json.dumps(identity, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()[:16]
+    return BatchEntry(key=key, line_number=line_number, request=GenerationRequest(**fields))
+
+class BatchCheckpoint:
+    """
+    Append-only log of finished batch entries.
+
+    Every finished entry is flushed to disk before the next one is reported,
+    so a run that is interrupted at any point can resume from the log.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.finished: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.finished.add(json.loads(line)["key"])
+                    except (ValueError, KeyError):
+                        # Last line of a run killed mid-write
+                        continue
+
+    def record(self, result: BatchResult) -> None:
+        line = json.dumps(dataclasses.asdict(result), ensure_ascii=False)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.finished.add(result.key)
+
+class BatchRunner:
+    """Runs batch entries through the dataset service with bounded concurrency"""
+
+    def __init__(
+        self,
+        service: DatasetService,
+        checkpoint: BatchCheckpoint,
+        concurrency: int = BATCH_CONCURRENCY,
+        on_result: Optional[Callable[[BatchEntry, BatchResult], None]] = None
+    ):
+        self.service = service
+        self.checkpoint = checkpoint
+        self.concurrency = max(1, concurrency)
+        self.on_result = on_result
+
+    async def run(self, entries: List[BatchEntry]) -> BatchSummary:
+        """
+        Generate every entry that isn't in the checkpoint yet.
+
+        Only entries whose dataset was saved in full are checkpointed. Failed
+        entries and ones that saved a partial dataset count as failed, and
+        are attempted again on the next run, picking up the records they
+        already generated.
+        """
+        summary = BatchSummary(total=len(entries))
+        pending = [entry for entry in entries if entry.key not in self.checkpoint.finished]
+        summary.skipped = len(entries) - len(pending)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+
+        async def run_entry(entry: BatchEntry) -> None:
+            async with semaphore:
+                result = await self._generate(entry)
+
+            if result.ok:
+                self.checkpoint.record(result)
+                summary.completed += 1
+                summary.records += result.records
+            else:
+                summary.failed += 1
+            if self.on_result is not None:
+                self.on_result(entry, result)
+
+        try:
+            await asyncio.gather(*(run_entry(entry) for entry in pending))
+        finally:
+            summary.elapsed_seconds = time.perf_counter() - started
+        return summary
+
+    async def _generate(self, entry: BatchEntry) -> BatchResult:
+        records = 0
+
+        def count(_):
+            nonlocal records
+            records += 1
+
+        started = time.perf_counter()
+        # Entries interrupted mid-way pick up from their records checkpoint
+        filepath, status = await self.service.generate_and_save_dataset(
+            entry.request, 
+            on_record=count, 
+            job_id=f"batch-{entry.key}"
+        )
+        return BatchResult(
+            key=entry.key,
+            filepath=filepath,
+            status=status,
+            records=records,
+            requested=entry.request.num_records,
+            seconds=time.perf_counter() - started
+        )
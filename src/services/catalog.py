@@ -0,0 +1,164 @@
+"""
+SQLite-backed catalog of generated datasets
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import astuple, dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    path TEXT PRIMARY KEY,
+    prompt TEXT,
+    model_type TEXT,
+    model_name TEXT,
+    output_format TEXT,
+    num_records INTEGER,
+    byte_size INTEGER NOT NULL,
+    schema_fingerprint TEXT,
+    created_at REAL NOT NULL,
+    duration_seconds REAL
+);
+CREATE INDEX IF NOT EXISTS idx_datasets_created_at ON datasets (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_datasets_model_created_at ON datasets (model_type, created_at DESC);
+"""
+
+@dataclass
+class DatasetEntry:
+    """
+    Metadata about one generated dataset file.
+
+    Files discovered on disk rather than generated by the service only have
+    the path, size and timestamp filled in.
+    """
+    path: str
+    prompt: Optional[str] = None
+    model_type: Optional[str] = None
+    model_name: Optional[str] = None
+    output_format: Optional[str] = None
+    num_records: Optional[int] = None
+    byte_size: int = 0
+    schema_fingerprint: Optional[str] = None
+    created_at: float = 0.0
+    duration_seconds: Optional[float] = None
+
+_COLUMNS = [field.name for field in fields(DatasetEntry)]
+
+def schema_fingerprint(record: Dict[str, Any]) -> str:
+    """Short hash of a record's field names and value types"""
+    shape = sorted((key, type(value).__name__) for key, value in record.items())
+    return hashlib.sha1(json.dumps(shape).encode("utf-8")).hexdigest()[:16]
+
+class DatasetCatalog:
+    """
+    Indexed, paginated catalog of the datasets in an output directory.
+
+    The service records every dataset it saves. Files added or removed by
+    other means are picked up by ``reconcile``.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add(self, entry: DatasetEntry) -> None:
+        """Insert or replace the entry for a file"""
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO datasets ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                astuple(entry)
+            )
+
+    def remove(self, path: str) -> None:
+        """Forget a file"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM datasets WHERE path = ?", (path,))
+
+    def get(self, path: str) -> Optional[DatasetEntry]:
+        """Look up the entry for a file"""
+        rows = self._query(f"SELECT {', '.join(_COLUMNS)} FROM datasets WHERE path = ?", (path,))
+        return DatasetEntry(*rows[0]) if rows else None
+
+    def list_datasets(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        model_type: Optional[str] = None
+    ) -> List[DatasetEntry]:
+        """
+        List datasets, newest first.
+
+        Args:
+            limit (Optional[int]): Maximum number of entries to return, None for all.
+            offset (int): Number of entries to skip.
+            model_type (Optional[str]): Only list datasets generated by this model type.
+        """
+        where, params = self._filter(model_type)
+        rows = self._query(
+            f"SELECT {', '.join(_COLUMNS)} FROM datasets{where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            (*params, -1 if limit is None else limit, offset)
+        )
+        return [DatasetEntry(*row) for row in rows]
+
+    def count(self, model_type: Optional[str] = None) -> int:
+        """Number of catalogued datasets"""
+        where, params = self._filter(model_type)
+        return self._query(f"SELECT COUNT(*) FROM datasets{where}", params)[0][0]
+
+    def reconcile(self, directory: str, extensions: Tuple[str, ...]) -> Tuple[int, int]:
+        """
+        Bring the catalog in line with the files on disk.
+
+        Returns:
+            Tuple[int, int]: (entries added, entries removed)
+        """
+        on_disk = {}
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(extensions):
+                on_disk[os.path.abspath(entry.path)] = entry.stat()
+
+        rows = self._query("SELECT path FROM datasets WHERE path LIKE ? ESCAPE '\\'", (self._prefix(directory),))
+        catalogued = {row[0] for row in rows}
+
+        added = [
+            DatasetEntry(path=path, byte_size=stat.st_size, created_at=stat.st_mtime)
+            for path, stat in on_disk.items() if path not in catalogued
+        ]
+        removed = [(path,) for path in catalogued if path not in on_disk]
+
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO datasets ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                (astuple(entry) for entry in added)
+            )
+            self._conn.executemany("DELETE FROM datasets WHERE path = ?", removed)
+
+        return len(added), len(removed)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    @staticmethod
+    def _filter(model_type: Optional[str]) -> Tuple[str, tuple]:
+        if model_type is None:
+            return "", ()
+        return " WHERE model_type = ?", (model_type,)
+
+    @staticmethod
+    def _prefix(directory: str) -> str:
+        """LIKE pattern matching paths inside a directory"""
+        base = os.path.join(os.path.abspath(directory), "")
+        return base.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
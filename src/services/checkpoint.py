@@ -0,0 +1,141 @@
+"""
+Write-ahead checkpoints for resumable dataset generation
+"""
+
+import dataclasses
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from ..models.request import GenerationRequest
+from ..config.settings import CHECKPOINT_FSYNC_INTERVAL_SECONDS
+
+CHECKPOINT_VERSION = 1
+
+# Request fields that don't change what gets generated
+_TRANSIENT_FIELDS = ("api_key", "use_cache", "timeout_seconds")
+
+def _request_state(request: GenerationRequest) -> Dict[str, Any]:
+    state = dataclasses.asdict(request)
+    for name in _TRANSIENT_FIELDS:
+        state.pop(name, None)
+    # Round-trip so it compares equal to the state read back from a file
+    return json.loads(json.dumps(state, ensure_ascii=False))
+
+class GenerationCheckpoint:
+    """
+    Append-only JSONL log of the records produced for one job.
+
+    The first line describes the request; every following line is a record
+    that was accepted for the dataset, logged before it is written to the
+    output file, or the plan its batches are generated from. Appends are
+    flushed immediately and fsynced at most every ``fsync_interval``
+    seconds. Reopening the log for the same request restores the records
+    and the plan, dropping a line torn by a crash mid-write.
+    """
+
+    def __init__(
+        self, 
+        path: str, 
+        job_id: str, 
+        request: GenerationRequest, 
+        fsync_interval: float = CHECKPOINT_FSYNC_INTERVAL_SECONDS
+    ):
+        self.path = path
+        self.job_id = job_id
+        self.fsync_interval = fsync_interval
+        self.records: List[Dict[str, Any]] = []
+        # Base seed and subtopics of a split job, so a resumed job keeps to them
+        self.plan: Optional[Dict[str, Any]] = None
+        self._last_sync = time.monotonic()
+
+        if os.path.exists(path):
+            header = self._restore()
+            if header.get("request") != _request_state(request):
+                raise ValueError(f"Checkpoint {path} belongs to a different request")
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._file = open(path, "w", encoding="utf-8")
+            self._write({
+                "version": CHECKPOINT_VERSION,
+                "job_id": job_id,
+                "request": _request_state(request),
+                "created_at": time.time(),
+            })
+            self._sync()
+
+        # Records recovered from a previous run, and all records in the log
+        self.restored = len(self.records)
+        self.logged = self.restored
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Log a record ahead of writing it to the dataset"""
+        self._write({"record": record})
+        self.logged += 1
+        if time.monotonic() - self._last_sync >= self.fsync_interval:
+            self._sync()
+
+    def save_plan(self, seed: int, subtopics: List[str]) -> None:
+        """Log the plan the job's batches are generated from"""
+        self.plan = {"seed": seed, "subtopics": subtopics}
+        self._write({"plan": self.plan})
+        self._sync()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._sync()
+            self._file.close()
+
+    def remove(self) -> None:
+        """Delete the log once the dataset is safely on disk"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @staticmethod
+    def read_header(path: str) -> Dict[str, Any]:
+        """The job ID and request state a checkpoint was written for"""
+        with open(path, encoding="utf-8") as f:
+            return json.loads(f.readline())
+
+    @staticmethod
+    def load_request(path: str, api_key: Optional[str] = None) -> GenerationRequest:
+        """Rebuild the request a checkpoint was written for"""
+        header = GenerationCheckpoint.read_header(path)
+        return GenerationRequest(**header["request"], api_key=api_key)
+
+    def _restore(self) -> Dict[str, Any]:
+        """Read the header and records, truncating an incomplete last line"""
+        header: Dict[str, Any] = {}
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+
+                valid_bytes += len(line)
+                if "record" in entry:
+                    self.records.append(entry["record"])
+                elif "plan" in entry:
+                    self.plan = entry["plan"]
+                else:
+                    header = entry
+
+        if valid_bytes < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+        return header
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
@@ -0,0 +1,31 @@
+"""
+Per-provider limits on concurrent batches, shared by every request
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Dict
+
+from ..config.settings import PROVIDER_CONCURRENCY
+
+_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+_slots_lock = threading.Lock()
+
+def get_provider_slots(model_type: str) -> asyncio.Semaphore:
+    """
+    The semaphore bounding concurrent batches for a provider.
+
+    Every request on the running event loop shares it, so concurrent jobs
+    split the provider's PROVIDER_CONCURRENCY between them instead of each
+    getting its own. Semaphores are bound to the loop they are used on, so
+    each loop gets its own set.
+    """
+    loop = asyncio.get_running_loop()
+    with _slots_lock:
+        slots = _slots.setdefault(loop, {})
+        if model_type not in slots:
+            slots[model_type] = asyncio.Semaphore(PROVIDER_CONCURRENCY.get(model_type, 1))
+        return slots[model_type]
@@ -2,70 +2,554 @@
 Service class for handling dataset generation and file operations
 """
 
-import json
+import asyncio
+import dataclasses
+import hashlib
 import os
+import re
+import time
+import uuid
+from contextlib import aclosing
 from datetime import datetime
-from typing import Tuple
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 
 from ..models.request import GenerationRequest
+from ..generators.base import DatasetGenerator
+from ..generators.cancellation import CancelToken, GenerationCancelled, cancel_scope, run_until_cancelled
 from ..generators.factory import GeneratorFactory
-from ..config.settings import OUTPUT_DIR
+from ..generators.registry import generator_registry
+from ..monitoring.tracing import count_tokens, record_span, span, trace_request
+from .catalog import DatasetCatalog, DatasetEntry, schema_fingerprint
+from .checkpoint import GenerationCheckpoint
+from .concurrency import get_provider_slots
+from .dedup import Deduplicator
+from .planner import ShardPlanner
+from .readers import DatasetReader, open_reader
+from .response_cache import ResponseCache
+from .retry import backoff_delay, get_retry_budget
+from .shard_sizer import ShardSizer
+from .validation import QuarantineWriter, RecordSchema, ValidationStage
+from .writers import (
+    OUTPUT_EXTENSIONS,
+    create_writer,
+    infer_schema,
+    is_columnar,
+    json_schema_to_arrow,
+    output_extension
+)
+from ..config.settings import (
+    CACHE_ENABLED, 
+    CACHE_MAX_RECORDS, 
+    CATALOG_FILENAME, 
+    CHECKPOINT_DIRNAME,
+    CHECKPOINT_ENABLED,
+    CHECKPOINT_RETENTION_SECONDS,
+    COMPACT_COMPRESSION,
+    COMPACT_OUTPUT_FORMAT,
+    DEDUP_ENABLED,
+    GENERATION_TIMEOUT_SECONDS,
+    INDEX_SUFFIX,
+    OUTPUT_DIR, 
+    PLANNING_ENABLED,
+    PROVIDER_API_KEY_ENV_VARS,
+    QUARANTINE_DIRNAME,
+    RETRY_MAX_ATTEMPTS,
+    SCHEMA_SAMPLE_SIZE,
+    SHARD_SIZING_ENABLED,
+    VALIDATION_ENABLED
+)
 
 class DatasetService:
     """Service class handling dataset generation and file operations"""
     
-    def __init__(self, output_dir: str = OUTPUT_DIR):
+    def __init__(self, output_dir: str = OUTPUT_DIR, cache: Optional[ResponseCache] = None):
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
+        self.cache = cache if cache is not None else (ResponseCache() if CACHE_ENABLED else None)
+        # Steers the batches of large requests toward different records
+        self.planner = ShardPlanner() if PLANNING_ENABLED else None
+        # Learns how many output tokens records take to size batches to the output limit
+        self.sizer = ShardSizer() if SHARD_SIZING_ENABLED else None
+        
+        # Index of generated files, synced with anything added or removed out-of-band
+        self.catalog = DatasetCatalog(os.path.join(self.output_dir, CATALOG_FILENAME))
+        self.catalog.reconcile(self.output_dir, OUTPUT_EXTENSIONS)
+        # Jobs that were never resumed don't keep their logs forever
+        self.prune_checkpoints()
     
-    async def generate_and_save_dataset(self, request: GenerationRequest) -> Tuple[str, str]:
+    async def generate_and_save_dataset(
+        self, 
+        request: GenerationRequest,
+        on_record: Optional[Callable[[Dict[str, Any]], None]] = None,
+        job_id: Optional[str] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> Tuple[str, str]:
         """
         Generate dataset and save to file
         
+        Args:
+            request (GenerationRequest): The dataset generation request.
+            on_record (Optional[Callable]): Called with each record as it is generated.
+            job_id (Optional[str]): Identifies the job's checkpoint. If a checkpoint
+                exists for it, only the records it is missing are generated.
+            cancel_token (Optional[CancelToken]): Stops the generation when cancelled.
+                The request's deadline is set on it.
+        
         Returns:
             Tuple[str, str]: (filepath, status_message)
         """
+        job_id = job_id or uuid.uuid4().hex
+        token = cancel_token or CancelToken()
+        timeout = request.timeout_seconds or GENERATION_TIMEOUT_SECONDS
+        if timeout is not None and token.deadline is None:
+            token.set_timeout(timeout)
+        
+        with trace_request(request) as trace, cancel_scope(token):
+            try:
+                filepath, status = await run_until_cancelled(
+                    self._generate_and_save_dataset(request, on_record, job_id), token
+                )
+            except GenerationCancelled as e:
+                filepath, status = "", f"🛑 Generation stopped: {e}."
+                if os.path.exists(self._checkpoint_path(job_id)):
+                    status += f" Resume job {job_id} to generate the rest."
+                trace.status = "cancelled"
+            
+            write = trace.spans.get("write")
+            trace.records = write.records if write is not None else 0
+            if not filepath and trace.status != "cancelled":
+                trace.status = "error"
+            elif filepath and trace.records < request.num_records:
+                trace.status = "partial"
+            return filepath, status
+    
+    async def _generate_and_save_dataset(
+        self, 
+        request: GenerationRequest,
+        on_record: Optional[Callable[[Dict[str, Any]], None]],
+        job_id: str
+    ) -> Tuple[str, str]:
+        """Generate and save a dataset, reporting failures in the status message"""
+        checkpoint = None
         try:
             # Validate request
             self._validate_request(request)
             
-            # Generate dataset
-            generator = GeneratorFactory.create_generator(request.model_type)
-            dataset = await generator.generate_dataset(request)
+            quarantine = QuarantineWriter(self._quarantine_path(request))
+            dedup = None
             
-            # Save dataset
-            filepath = self._save_dataset(dataset, request)
+            with generator_registry.acquire(request.model_type) as generator:
+                # Reuse a cached result for identical requests
+                use_cache = (
+                    self.cache is not None 
+                    and request.use_cache 
+                    and request.num_records <= CACHE_MAX_RECORDS
+                )
+                cache_key = self.cache.make_key(request, generator) if use_cache else None
+                cached = self.cache.get(cache_key) if use_cache else None
+                
+                if cached is not None:
+                    records = self._iter_cached(cached)
+                else:
+                    checkpoint = self._open_checkpoint(request, job_id)
+                    restored = checkpoint.records if checkpoint is not None else []
+                    
+                    # A resumed job keeps checking records against the schema it started with
+                    schema = None
+                    if request.schema:
+                        schema = RecordSchema.from_json_schema(request.schema)
+                    elif restored:
+                        schema = RecordSchema.infer(restored[:SCHEMA_SAMPLE_SIZE])
+                    
+                    validation = ValidationStage(
+                        schema=schema,
+                        on_reject=quarantine.write
+                    ) if VALIDATION_ENABLED else None
+                    dedup = Deduplicator(
+                        fields=request.dedup_fields, 
+                        near_duplicates=request.near_dedup
+                    ) if DEDUP_ENABLED else None
+                    records = self._iter_checkpointed(generator, request, validation, dedup, checkpoint)
+                
+                collected = [] if use_cache and cached is None else None
+                
+                def handle_record(record: Dict[str, Any]) -> None:
+                    if collected is not None:
+                        collected.append(record)
+                    if on_record is not None:
+                        on_record(record)
+                
+                # Generate and save dataset, writing records as they arrive
+                try:
+                    filepath, count = await self._save_dataset(
+                        records, request, handle_record, model_name=getattr(generator, "model_name", None)
+                    )
+                finally:
+                    quarantine.close()
+                    if checkpoint is not None:
+                        checkpoint.close()
+                
+                # A complete dataset is safely on disk, the log is no longer needed
+                if checkpoint is not None and count >= request.num_records:
+                    checkpoint.remove()
+                elif cached is not None and os.path.exists(self._checkpoint_path(job_id)):
+                    # A resumed job answered from the cache leaves its log unopened
+                    os.remove(self._checkpoint_path(job_id))
+                
+                # Only complete datasets are worth replaying
+                if collected is not None and count >= request.num_records:
+                    self.cache.put(cache_key, collected)
             
-            return filepath, f"✅ Generated {len(dataset)} records successfully!"
+            source = " (from cache)" if cached is not None else ""
+            if count < request.num_records:
+                status = f"⚠️ Generated {count} of {request.num_records} records, retries were exhausted."
+                if checkpoint is not None:
+                    status += f" Resume job {job_id} to generate the rest."
+            else:
+                status = f"✅ Generated {count} records successfully{source}!"
+            if dedup is not None and dedup.dropped:
+                status += f" {dedup.dropped} duplicate records dropped."
+            if quarantine.count:
+                status += f" {quarantine.count} nonconforming records quarantined in {quarantine.path}"
+            if checkpoint is not None and checkpoint.restored:
+                status += f" {checkpoint.restored} records were recovered from an earlier run."
+            return filepath, status
+        
+        except GenerationCancelled:
+            raise
         
         except Exception as e:
-            return "", f"❌ Error: {str(e)}"
+            status = f"❌ Error: {str(e)}"
+            if checkpoint is not None and checkpoint.logged:
+                status += f" {checkpoint.logged} records were saved, resume job {job_id} to generate the rest."
+            return "", status
+    
+    async def _iter_cached(self, records: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """Replay cached records through the same path as generated ones"""
+        for record in records:
+            yield record
+    
+    async def _iter_checkpointed(
+        self, 
+        generator: DatasetGenerator, 
+        request: GenerationRequest,
+        validation: Optional[ValidationStage],
+        dedup: Optional[Deduplicator],
+        checkpoint: Optional[GenerationCheckpoint]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Replay the records saved by an earlier run, then generate and log the rest"""
+        restored = checkpoint.records if checkpoint is not None else []
+        for record in restored:
+            # Later records must not repeat the restored ones
+            self._is_duplicate(dedup, record)
+            yield record
+        
+        remaining = request.num_records - len(restored)
+        if remaining <= 0:
+            return
+        
+        batch = await self._keep_plan(generator, dataclasses.replace(request, num_records=remaining), checkpoint)
+        async for record in self._iter_complete_records(generator, batch, validation, dedup):
+            if checkpoint is not None:
+                checkpoint.append(record)
+            yield record
+    
+    async def _keep_plan(
+        self, 
+        generator: DatasetGenerator, 
+        request: GenerationRequest,
+        checkpoint: Optional[GenerationCheckpoint]
+    ) -> GenerationRequest:
+        """
+        Fix the seed and subtopics of a split job in its checkpoint
+        
+        Without them a resumed job would ask for new subtopics, which costs a
+        model call and may cover ground the restored records already have.
+        """
+        if checkpoint is None or self.planner is None:
+            return request
+        
+        if checkpoint.plan is None:
+            if request.num_records <= self._batch_size(generator, request):
+                return request
+            checkpoint.save_plan(*await self.planner.settle(generator, request))
+        
+        return dataclasses.replace(
+            request, 
+            seed=checkpoint.plan["seed"], 
+            subtopics=checkpoint.plan["subtopics"] or None
+        )
+    
+    async def _iter_complete_records(
+        self, 
+        generator: DatasetGenerator, 
+        request: GenerationRequest,
+        validation: Optional[ValidationStage],
+        dedup: Optional[Deduplicator] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield records until the requested number has been produced
+        
+        Records lost to truncation, failed batches, validation or
+        deduplication are made up by follow-up generations for just the
+        shortfall. Follow-ups back off exponentially and draw on the
+        provider's shared retry budget. Records beyond the requested number
+        are dropped.
+        """
+        produced = 0
+        last_error = None
+        budget = get_retry_budget(request.model_type)
+        batch = request
+        
+        for attempt in range(RETRY_MAX_ATTEMPTS + 1):
+            if attempt > 0:
+                if not budget.try_acquire():
+                    break
+                await asyncio.sleep(backoff_delay(attempt - 1))
+            
+            try:
+                async with aclosing(self.iter_records(generator, batch)) as records:
+                    async for record in records:
+                        for accepted in self._validate(validation, [record]):
+                            if produced < request.num_records and not self._is_duplicate(dedup, accepted):
+                                produced += 1
+                                yield accepted
+                        if produced >= request.num_records:
+                            break
+            except ValueError:
+                # Invalid requests won't succeed on a retry
+                raise
+            except Exception as e:
+                last_error = e
+            
+            for accepted in self._validate(validation, None):
+                if produced < request.num_records and not self._is_duplicate(dedup, accepted):
+                    produced += 1
+                    yield accepted
+            
+            shortfall = request.num_records - produced
+            if shortfall <= 0:
+                break
+            batch = dataclasses.replace(request, num_records=shortfall)
+        
+        if produced == 0 and last_error is not None:
+            raise last_error
+    
+    def _validate(
+        self, 
+        validation: Optional[ValidationStage], 
+        records: Optional[List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Pass records through validation, or flush it when records is None"""
+        if validation is None:
+            return records or []
+        
+        started = time.perf_counter()
+        if records is None:
+            accepted = validation.flush()
+        else:
+            accepted = [ready for record in records for ready in validation.process(record)]
+        record_span("validation", time.perf_counter() - started, len(records or []))
+        return accepted
+    
+    def _is_duplicate(self, dedup: Optional[Deduplicator], record: Dict[str, Any]) -> bool:
+        """Check a record against the deduplicator, if there is one"""
+        if dedup is None:
+            return False
+        
+        with span("dedup", records=1):
+            return dedup.is_duplicate(record)
+    
+    async def iter_records(
+        self, 
+        generator: DatasetGenerator, 
+        request: GenerationRequest
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield generated records as soon as they are available
+        
+        Requests that fit in one completion are streamed record by record.
+        Larger requests are split into concurrent batches, each steered toward
+        its own subtopics, whose records are yielded as each batch completes.
+        Batch sizes and output budgets follow the tokens per record observed
+        for earlier batches of the same prompt. At most the requested number
+        of records is yielded, however many the model returns.
+        """
+        batch_size = self._batch_size(generator, request)
+        produced = 0
+        if request.num_records <= batch_size:
+            async with aclosing(generator.stream_dataset(self._budget(generator, request))) as records:
+                async for record in records:
+                    yield record
+                    produced += 1
+                    if produced >= request.num_records:
+                        return
+            return
+        
+        # Shared with every other request for the provider
+        semaphore = get_provider_slots(request.model_type)
+        
+        errors = []
+        
+        async def run_shard(shard: GenerationRequest) -> List[Dict[str, Any]]:
+            async with semaphore:
+                usage = None
+                try:
+                    started = time.perf_counter()
+                    with count_tokens() as usage:
+                        records = await generator.generate_dataset(shard)
+                    record_span("generation", time.perf_counter() - started, len(records))
+                    if self.sizer is not None:
+                        self.sizer.observe(generator, shard, len(records), usage.output_tokens)
+                    return records
+                except Exception as e:
+                    if self.sizer is not None and usage is not None:
+                        # A batch cut off before its first record still shows records need more room
+                        self.sizer.observe(generator, shard, 0, usage.output_tokens)
+                    # Keep the other batches going, the caller makes up the shortfall
+                    errors.append(e)
+                    return []
+        
+        shards = [self._budget(generator, shard) for shard in self._split_request(request, batch_size)]
+        if self.planner is not None:
+            shards = await self.planner.plan(generator, request, shards)
+        
+        tasks = [asyncio.ensure_future(run_shard(shard)) for shard in shards]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for record in await next_done:
+                    yield record
+                    produced += 1
+                    if produced >= request.num_records:
+                        return
+        finally:
+            # Don't leave batches running if the consumer stops early
+            for task in tasks:
+                task.cancel()
+        
+        if errors:
+            raise errors[0]
+    
+    def _batch_size(self, generator: DatasetGenerator, request: GenerationRequest) -> int:
+        """Records requested per completion"""
+        if self.sizer is None:
+            return generator.records_per_batch()
+        return self.sizer.batch_size(generator, request)
+    
+    def _budget(self, generator: DatasetGenerator, request: GenerationRequest) -> GenerationRequest:
+        """Lower a completion's output budget to what its records are expected to need"""
+        if self.sizer is None:
+            return request
+        return self.sizer.budget(generator, request)
+    
+    def _split_request(self, request: GenerationRequest, batch_size: int) -> List[GenerationRequest]:
+        """Split a request into sub-requests of at most batch_size records"""
+        shards = []
+        remaining = request.num_records
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            shards.append(dataclasses.replace(request, num_records=size))
+            remaining -= size
+        return shards
     
     def _validate_request(self, request: GenerationRequest) -> None:
         """Validate the generation request"""
         if GeneratorFactory.requires_api_key(request.model_type) and not request.api_key:
             raise ValueError(f"API key required for {request.model_type}")
     
-    def _save_dataset(self, dataset: list, request: GenerationRequest) -> str:
-        """Save dataset to JSON file"""
-        # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_prompt = self._sanitize_prompt(request.prompt)
-        filename = f"dataset_{safe_prompt}_{timestamp}.json"
-        filepath = os.path.join(self.output_dir, filename)
+    async def _save_dataset(
+        self, 
+        records: AsyncIterator[Dict[str, Any]], 
+        request: GenerationRequest,
+        on_record: Callable[[Dict[str, Any]], None],
+        model_name: Optional[str] = None
+    ) -> Tuple[str, int]:
+        """
+        Stream records to a file in the request's output format and catalog it
         
-        # Convert to absolute path to avoid issues
-        filepath = os.path.abspath(filepath)
+        Returns:
+            Tuple[str, int]: (filepath, number of records written)
+        """
+        safe_prompt = self._sanitize_prompt(request.prompt)
+        extension = output_extension(request.output_format, request.compression)
+        filepath = self._create_output_file(f"dataset_{safe_prompt}", extension)
         
-        # Save dataset
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(dataset, f, indent=2, ensure_ascii=False)
+        # Save records as they are produced
+        started = time.monotonic()
+        fingerprint = None
+        # Columns follow the requested schema rather than whatever the first records hold
+        schema = None
+        if request.schema and is_columnar(request.output_format):
+            schema = json_schema_to_arrow(request.schema)
+        try:
+            with create_writer(request.output_format, filepath, request.compression, schema=schema) as writer:
+                async for record in records:
+                    if fingerprint is None:
+                        fingerprint = schema_fingerprint(record)
+                    with span("write", records=1):
+                        writer.write(record)
+                    on_record(record)
+        except BaseException:
+            # Don't leave a truncated file behind
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            raise
         
         # Verify file was created
         if not os.path.exists(filepath):
             raise Exception(f"Failed to create file at {filepath}")
+        
+        self.catalog.add(DatasetEntry(
+            path=filepath,
+            prompt=request.prompt,
+            model_type=request.model_type,
+            model_name=model_name,
+            output_format=request.output_format,
+            num_records=writer.records_written,
+            byte_size=os.path.getsize(filepath),
+            schema_fingerprint=fingerprint,
+            created_at=time.time(),
+            duration_seconds=time.monotonic() - started
+        ))
             
-        return filepath
+        return filepath, writer.records_written
+    
+    def _open_checkpoint(self, request: GenerationRequest, job_id: str) -> Optional[GenerationCheckpoint]:
+        """Open a job's checkpoint, restoring its records if it already exists"""
+        if not CHECKPOINT_ENABLED:
+            return None
+        return GenerationCheckpoint(self._checkpoint_path(job_id), job_id, request)
+    
+    def _checkpoint_path(self, job_id: str) -> str:
+        """Path of a job's checkpoint file"""
+        # IDs are caller-supplied, only use them as file names if that is safe
+        name = job_id if re.fullmatch(r"[\w.-]{1,128}", job_id) else hashlib.sha256(job_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.output_dir, CHECKPOINT_DIRNAME, f"{name}.wal.jsonl")
+    
+    def _create_output_file(self, stem: str, extension: str) -> str:
+        """
+        Create an empty, uniquely named file in the output directory
+        
+        Concurrent jobs for the same prompt start within the same second, so
+        names get a random suffix and are created exclusively, a name that
+        is already taken is never opened for writing.
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        while True:
+            filename = f"{stem}_{timestamp}_{uuid.uuid4().hex[:8]}{extension}"
+            filepath = os.path.abspath(os.path.join(self.output_dir, filename))
+            try:
+                with open(filepath, "x"):
+                    return filepath
+            except FileExistsError:
+                continue
+    
+    def _quarantine_path(self, request: GenerationRequest) -> str:
+        """Path of the JSONL file collecting a request's rejected records"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_prompt = self._sanitize_prompt(request.prompt)
+        filename = f"rejected_{safe_prompt}_{timestamp}_{uuid.uuid4().hex[:8]}.jsonl"
+        return os.path.abspath(os.path.join(self.output_dir, QUARANTINE_DIRNAME, filename))
     
     def _sanitize_prompt(self, prompt: str) -> str:
         """Sanitize prompt for use in filename"""
@@ -74,24 +558,208 @@ class DatasetService:
         safe = safe.replace(' ', '_').lower()
         return safe if safe else "dataset"  # Fallback if prompt is empty after sanitization
 
-    def get_generated_files(self) -> list[str]:
-        """Get list of generated dataset files"""
-        if not os.path.exists(self.output_dir):
+    def checkpoint_request(self, job_id: str, api_key: Optional[str] = None) -> Optional[GenerationRequest]:
+        """
+        The request of an unfinished job, None if the job has no checkpoint
+        
+        The API key isn't stored in checkpoints. Without one, the key is read
+        from the provider's environment variable.
+        """
+        path = self._checkpoint_path(job_id)
+        if not os.path.exists(path):
+            return None
+        
+        request = GenerationCheckpoint.load_request(path)
+        env_var = PROVIDER_API_KEY_ENV_VARS.get(request.model_type)
+        request.api_key = api_key or (os.environ.get(env_var) if env_var else None)
+        return request
+    
+    async def resume_job(
+        self, 
+        job_id: str, 
+        api_key: Optional[str] = None,
+        on_record: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> Tuple[str, str]:
+        """Finish an interrupted job, generating only the records it is missing"""
+        request = self.checkpoint_request(job_id, api_key)
+        if request is None:
+            return "", f"❌ Error: No checkpoint found for job {job_id}"
+        return await self.generate_and_save_dataset(request, on_record, job_id=job_id, cancel_token=cancel_token)
+    
+    def list_resumable_jobs(self) -> List[str]:
+        """IDs of jobs that stopped before their dataset was saved, most recently active first"""
+        directory = os.path.join(self.output_dir, CHECKPOINT_DIRNAME)
+        if not os.path.isdir(directory):
             return []
         
-        files = []
-        for filename in os.listdir(self.output_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.output_dir, filename)
-                files.append(filepath)
+        jobs = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".wal.jsonl"):
+                try:
+                    jobs.append((entry.stat().st_mtime, GenerationCheckpoint.read_header(entry.path)["job_id"]))
+                except (OSError, ValueError, KeyError):
+                    continue
+        return [job_id for _, job_id in sorted(jobs, reverse=True)]
+    
+    def prune_checkpoints(self, max_age_seconds: Optional[float] = CHECKPOINT_RETENTION_SECONDS) -> int:
+        """
+        Delete the logs of stopped jobs that haven't been touched for max_age_seconds
+        
+        Running jobs append to their log as records arrive, so only logs of
+        jobs that stopped long ago are old enough to be removed.
+        
+        Returns:
+            int: Number of logs deleted.
+        """
+        directory = os.path.join(self.output_dir, CHECKPOINT_DIRNAME)
+        if max_age_seconds is None or not os.path.isdir(directory):
+            return 0
         
-        return sorted(files, key=os.path.getmtime, reverse=True)
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for entry in os.scandir(directory):
+            try:
+                if entry.name.endswith(".wal.jsonl") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+    
+    def get_generated_files(self, limit: Optional[int] = None, offset: int = 0) -> list[str]:
+        """Get generated dataset files, newest first"""
+        return [entry.path for entry in self.catalog.list_datasets(limit=limit, offset=offset)]
+    
+    def list_datasets(
+        self, 
+        limit: Optional[int] = None, 
+        offset: int = 0, 
+        model_type: Optional[str] = None
+    ) -> List[DatasetEntry]:
+        """Get catalog entries for generated datasets, newest first"""
+        return self.catalog.list_datasets(limit=limit, offset=offset, model_type=model_type)
+    
+    def open_dataset(self, filepath: str) -> DatasetReader:
+        """
+        Open a dataset for lazy iteration and access by record index
+        
+        JSON and JSONL files are memory-mapped and indexed, Parquet and Arrow
+        files are read one memory-mapped row group at a time. Compressed text
+        and CSV files can only be streamed, indexing them scans the file.
+        """
+        return open_reader(filepath)
+    
+    def compact_datasets(
+        self,
+        filepaths: List[str],
+        output_format: str = COMPACT_OUTPUT_FORMAT,
+        compression: Optional[str] = COMPACT_COMPRESSION,
+        dedup: bool = True,
+        dedup_fields: Optional[List[str]] = None,
+        near_dedup: bool = False,
+        remove_inputs: bool = False
+    ) -> Tuple[str, int, int]:
+        """
+        Merge datasets into one file, dropping duplicates across all of them
+        
+        Records are streamed through, so collections larger than memory can be
+        merged. Inputs are read once up front so Parquet and Arrow output gets
+        a schema covering every input's fields. The merged file is added to
+        the catalog.
+        
+        Args:
+            filepaths (List[str]): Datasets to merge, in order.
+            output_format (str): Format of the merged file.
+            compression (Optional[str]): Compression of the merged file.
+            dedup (bool): Drop records that duplicate an earlier one.
+            dedup_fields (Optional[List[str]]): Fields compared for duplicates.
+            near_dedup (bool): Also drop near-duplicates.
+            remove_inputs (bool): Delete the merged datasets in the output directory afterwards.
+        
+        Returns:
+            Tuple[str, int, int]: (filepath, records written, duplicates dropped)
+        
+        Raises:
+            ValueError: If there are no inputs, or CSV output would drop fields of some records.
+        """
+        if not filepaths:
+            raise ValueError("No datasets to compact")
+        
+        started = time.monotonic()
+        # Columnar schemas and CSV headers are fixed before the first record is
+        # written, so check every input first rather than losing fields
+        schema = None
+        if is_columnar(output_format):
+            schema = infer_schema(self._iter_inputs(filepaths))
+        elif output_format == "csv":
+            self._check_csv_fields(filepaths)
+        
+        deduplicator = Deduplicator(fields=dedup_fields, near_duplicates=near_dedup) if dedup else None
+        fingerprint = None
+        filepath = self._create_output_file("merged", output_extension(output_format, compression))
+        try:
+            with create_writer(output_format, filepath, compression, schema=schema) as writer:
+                for record in self._iter_inputs(filepaths):
+                    if deduplicator is not None and deduplicator.is_duplicate(record):
+                        continue
+                    if fingerprint is None:
+                        fingerprint = schema_fingerprint(record)
+                    writer.write(record)
+        except BaseException:
+            # Don't leave a truncated file behind
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            raise
+        
+        self.catalog.add(DatasetEntry(
+            path=filepath,
+            output_format=output_format,
+            num_records=writer.records_written,
+            byte_size=os.path.getsize(filepath),
+            schema_fingerprint=fingerprint,
+            created_at=time.time(),
+            duration_seconds=time.monotonic() - started
+        ))
+        
+        if remove_inputs:
+            for path in filepaths:
+                self.delete_file(path)
+        
+        return filepath, writer.records_written, deduplicator.dropped if deduplicator is not None else 0
+    
+    def _iter_inputs(self, filepaths: List[str]) -> Iterator[Dict[str, Any]]:
+        """Records of several datasets, one file after another"""
+        for path in filepaths:
+            with open_reader(path) as reader:
+                yield from reader
+    
+    def _check_csv_fields(self, filepaths: List[str]) -> None:
+        """Make sure every record fits the CSV header taken from the first one"""
+        header = None
+        for record in self._iter_inputs(filepaths):
+            if header is None:
+                header = set(record)
+            elif not header.issuperset(record):
+                extra = ", ".join(sorted(set(record) - header))
+                raise ValueError(
+                    f"CSV output would drop fields the first record lacks ({extra}), "
+                    f"compact to parquet, arrow, json or jsonl instead"
+                )
+    
+    def reconcile_catalog(self) -> Tuple[int, int]:
+        """Sync the catalog with files added or removed outside the service"""
+        return self.catalog.reconcile(self.output_dir, OUTPUT_EXTENSIONS)
     
     def delete_file(self, filepath: str) -> bool:
         """Delete a generated file"""
         try:
-            if os.path.exists(filepath) and filepath.startswith(self.output_dir):
+            filepath = os.path.abspath(filepath)
+            if os.path.exists(filepath) and filepath.startswith(os.path.abspath(self.output_dir)):
                 os.remove(filepath)
+                self.catalog.remove(filepath)
+                if os.path.exists(filepath + INDEX_SUFFIX):
+                    os.remove(filepath + INDEX_SUFFIX)
                 return True
         except Exception:
             pass
@@ -0,0 +1,161 @@
+"""
+Streaming deduplication of generated records
+"""
+
+import hashlib
+import json
+import random
+import zlib
+from array import array
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import DEDUP_IGNORE_FIELDS, NEAR_DUP_BANDS, NEAR_DUP_ROWS
+
+class HashIndex:
+    """
+    Compact set of 64-bit hashes.
+
+    Hashes live in a flat open-addressing table kept at most half full, so each
+    entry costs about 16 bytes instead of the ~100 bytes of a Python set of ints.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        size = 1
+        while size < capacity * 2:
+            size *= 2
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._slots) * self._slots.itemsize
+
+    def add(self, value: int) -> bool:
+        """Insert a hash, returning False if it was already present"""
+        # Zero marks an empty slot
+        value = value or 1
+        if (self._size + 1) * 2 > len(self._slots):
+            self._grow()
+
+        slots, mask = self._slots, self._mask
+        index = value & mask
+        while True:
+            current = slots[index]
+            if current == 0:
+                slots[index] = value
+                self._size += 1
+                return True
+            if current == value:
+                return False
+            index = (index + 1) & mask
+
+    def __contains__(self, value: int) -> bool:
+        value = value or 1
+        slots, mask = self._slots, self._mask
+        index = value & mask
+        while True:
+            current = slots[index]
+            if current == 0:
+                return False
+            if current == value:
+                return True
+            index = (index + 1) & mask
+
+    def _grow(self) -> None:
+        old = self._slots
+        self._slots = array("Q", bytes(8 * len(old) * 2))
+        self._mask = len(self._slots) - 1
+        self._size = 0
+        for value in old:
+            if value:
+                self.add(value)
+
+def _normalize(value: Any) -> Any:
+    """Canonical form of a value: case- and whitespace-insensitive strings"""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+class MinHashLSH:
+    """
+    Near-duplicate detection with MinHash signatures and LSH banding.
+
+    Records are reduced to character 3-gram shingles; two records collide when
+    any band of their signatures matches. Only the band hashes are kept, in a
+    HashIndex, so memory stays at ``bands`` compact entries per record.
+    """
+
+    _PRIME = (1 << 61) - 1
+
+    def __init__(self, bands: int = NEAR_DUP_BANDS, rows: int = NEAR_DUP_ROWS, seed: int = 1):
+        rng = random.Random(seed)
+        self.bands = bands
+        self.rows = rows
+        self._perms = [
+            (rng.randrange(1, self._PRIME), rng.randrange(0, self._PRIME))
+            for _ in range(bands * rows)
+        ]
+        self._index = HashIndex()
+
+    def add(self, text: str) -> bool:
+        """Register a text, returning False if it is a near-duplicate of an earlier one"""
+        shingles = {zlib.crc32(text[i:i + 3].encode("utf-8")) for i in range(max(1, len(text) - 2))}
+        prime = self._PRIME
+        signature = [min((a * s + b) % prime for s in shingles) for a, b in self._perms]
+
+        band_hashes = [
+            _hash64(repr((band, signature[band * self.rows:(band + 1) * self.rows])).encode("utf-8"))
+            for band in range(self.bands)
+        ]
+        is_new = not any(band_hash in self._index for band_hash in band_hashes)
+        for band_hash in band_hashes:
+            self._index.add(band_hash)
+        return is_new
+
+class Deduplicator:
+    """
+    Drops records that were already seen in the current dataset.
+
+    Exact duplicates are detected on a canonical form of the chosen fields (all
+    fields except DEDUP_IGNORE_FIELDS by default), so differing IDs or letter
+    case don't hide a repeat. Near-duplicates are optionally detected with
+    MinHash/LSH over the same fields.
+    """
+
+    def __init__(self, fields: Optional[List[str]] = None, near_duplicates: bool = False):
+        self.fields = fields
+        self.ignore_fields = set(DEDUP_IGNORE_FIELDS)
+        self._exact = HashIndex()
+        self._near = MinHashLSH() if near_duplicates else None
+        self.dropped = 0
+
+    def is_duplicate(self, record: Dict[str, Any]) -> bool:
+        """Check a record against everything seen so far, remembering it if new"""
+        if self.fields is not None:
+            key_fields = {key: record.get(key) for key in self.fields}
+        else:
+            key_fields = {key: value for key, value in record.items() if key not in self.ignore_fields}
+
+        normalized = _normalize(key_fields)
+        canonical = json.dumps(normalized, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        duplicate = not self._exact.add(_hash64(canonical.encode("utf-8")))
+
+        if not duplicate and self._near is not None:
+            # Compare values only, field names are shared by every record
+            text = " ".join(str(normalized[key]) for key in sorted(normalized))
+            duplicate = not self._near.add(text)
+
+        if duplicate:
+            self.dropped += 1
+        return duplicate
@@ -0,0 +1,223 @@
+"""
+Background job subsystem for dataset generation
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from ..models.request import GenerationRequest
+from .dataset_service import DatasetService
+from ..generators.cancellation import CancelToken, GenerationCancelled, run_until_cancelled
+from ..monitoring.tracing import record_span, trace_request
+from ..config.settings import JOB_RETENTION_SECONDS, MAX_PENDING_JOBS, MODEL_JOB_SLOTS, PREVIEW_ROWS
+
+class JobStatus:
+    """Lifecycle states of a generation job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue cannot accept more work"""
+    pass
+
+@dataclass
+class Job:
+    """
+    A dataset generation request tracked by the job manager.
+    """
+    job_id: str
+    request: GenerationRequest
+    status: str = JobStatus.QUEUED
+    filepath: str = ""
+    message: str = ""
+    records_generated: int = 0
+    # Latest records, bounded so previews don't grow with the dataset
+    preview: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=PREVIEW_ROWS))
+    cancel_token: CancelToken = field(default_factory=CancelToken, repr=False)
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+    @property
+    def records_per_second(self) -> Optional[float]:
+        if self.started_at is None or not self.records_generated:
+            return None
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return self.records_generated / elapsed if elapsed > 0 else None
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated time until the remaining records are generated"""
+        rate = self.records_per_second
+        if rate is None or self.done:
+            return None
+        return max(0, self.request.num_records - self.records_generated) / rate
+
+class JobManager:
+    """
+    Runs generation jobs on a single long-lived event loop.
+
+    Jobs are accepted into a bounded queue and dispatched in submission order,
+    with a per-model limit on how many jobs run at the same time. Callers get a
+    job ID back immediately and poll the job for progress.
+    """
+
+    def __init__(
+        self,
+        service: Optional[DatasetService] = None,
+        max_pending: int = MAX_PENDING_JOBS,
+        model_slots: Optional[Dict[str, int]] = None
+    ):
+        self.service = service or DatasetService()
+        self.max_pending = max_pending
+        self.model_slots = model_slots or MODEL_JOB_SLOTS
+        self._jobs: Dict[str, Job] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The background event loop, started on first use"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="job-loop", daemon=True).start()
+            return self._loop
+
+    def submit(self, request: GenerationRequest, job_id: Optional[str] = None) -> Job:
+        """
+        Queue a generation request.
+
+        Raises:
+            JobQueueFullError: If the maximum number of pending jobs is reached.
+            ValueError: If a job with the same ID is still running.
+        """
+        loop = self.loop
+
+        with self._lock:
+            self._prune_finished()
+            pending = sum(1 for job in self._jobs.values() if not job.done)
+            if pending >= self.max_pending:
+                raise JobQueueFullError(f"Too many pending jobs ({pending}), please try again later")
+
+            if job_id is not None and job_id in self._jobs and not self._jobs[job_id].done:
+                raise ValueError(f"Job {job_id} is still running")
+
+            job = Job(job_id=job_id or uuid.uuid4().hex, request=request)
+            self._jobs[job.job_id] = job
+
+        asyncio.run_coroutine_threadsafe(self._run(job), loop)
+        return job
+
+    def resume(self, job_id: str, api_key: Optional[str] = None) -> Job:
+        """
+        Queue the remainder of a job that stopped before its dataset was saved.
+
+        Raises:
+            KeyError: If the job left no checkpoint.
+            JobQueueFullError: If the maximum number of pending jobs is reached.
+        """
+        request = self.service.checkpoint_request(job_id, api_key)
+        if request is None:
+            raise KeyError(f"No checkpoint found for job {job_id}")
+        return self.submit(request, job_id=job_id)
+
+    def cancel(self, job_id: str, reason: str = "cancelled by user") -> bool:
+        """
+        Stop a queued or running job, freeing its model slot right away.
+
+        Returns False if the job is unknown or already finished.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job.cancel_token.cancel(reason)
+        return True
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Look up a job by ID"""
+        return self._jobs.get(job_id)
+
+    def queue_position(self, job: Job) -> int:
+        """Number of queued jobs for the same model that were submitted earlier"""
+        return sum(
+            1 for other in list(self._jobs.values())
+            if other.status == JobStatus.QUEUED
+            and other.request.model_type == job.request.model_type
+            and other.created_at < job.created_at
+        )
+
+    def list_jobs(self) -> List[Job]:
+        """All tracked jobs, newest first"""
+        return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    async def _run(self, job: Job) -> None:
+        """Wait for a free model slot, then run the job"""
+        # asyncio.Semaphore wakes waiters in FIFO order, so jobs are served fairly
+        slot = self._get_slot(job.request.model_type)
+        try:
+            # Cancelled jobs leave the queue without waiting for their turn
+            await run_until_cancelled(slot.acquire(), job.cancel_token)
+        except GenerationCancelled as e:
+            job.message = f"🛑 Job {e} before it started"
+            job.status = JobStatus.CANCELLED
+            job.finished_at = time.time()
+            return
+
+        try:
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+
+            def on_record(record: dict) -> None:
+                job.records_generated += 1
+                job.preview.append(record)
+
+            try:
+                with trace_request(job.request, trace_id=job.job_id):
+                    record_span("queue_wait", job.started_at - job.created_at)
+                    filepath, message = await self.service.generate_and_save_dataset(
+                        job.request, 
+                        on_record=on_record, 
+                        job_id=job.job_id,
+                        cancel_token=job.cancel_token
+                    )
+            except Exception as e:
+                filepath, message = "", f"❌ Error: {str(e)}"
+
+            job.filepath = filepath
+            job.message = message
+            if filepath:
+                job.status = JobStatus.COMPLETED
+            elif job.cancel_token.cancelled:
+                job.status = JobStatus.CANCELLED
+            else:
+                job.status = JobStatus.FAILED
+            job.finished_at = time.time()
+        finally:
+            slot.release()
+
+    def _get_slot(self, model_type: str) -> asyncio.Semaphore:
+        """Concurrency limiter for a model, created on the job loop"""
+        if model_type not in self._slots:
+            self._slots[model_type] = asyncio.Semaphore(self.model_slots.get(model_type, 1))
+        return self._slots[model_type]
+
+    def _prune_finished(self) -> None:
+        """Forget finished jobs older than the retention period"""
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id, job in list(self._jobs.items()):
+            if job.done and job.finished_at < cutoff:
+                del self._jobs[job_id]
@@ -0,0 +1,120 @@
+"""
+Planning step that steers the batches of a split request toward different records
+"""
+
+import dataclasses
+import math
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.request import GenerationRequest
+from ..generators.base import DatasetGenerator
+from ..generators.cancellation import GenerationCancelled
+from ..monitoring.tracing import span
+from ..config.settings import PLAN_MAX_SUBTOPICS, PLAN_RECORDS_PER_SUBTOPIC, SHARD_TEMPERATURE_SPREAD
+
+_PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {"subtopic": {"type": "string"}},
+    "required": ["subtopic"],
+}
+
+class ShardPlanner:
+    """
+    Gives each batch of a split request its own slice of the topic.
+
+    Batches generated from the same prompt tend to return the same popular
+    entities. The planner asks the model once for distinct subtopics of the
+    request and hands every batch a disjoint share of them, along with its
+    own sampling seed and a temperature spread around the base one.
+    """
+
+    def __init__(
+        self,
+        records_per_subtopic: int = PLAN_RECORDS_PER_SUBTOPIC,
+        max_subtopics: int = PLAN_MAX_SUBTOPICS,
+        temperature_spread: float = SHARD_TEMPERATURE_SPREAD
+    ):
+        self.records_per_subtopic = max(1, records_per_subtopic)
+        self.max_subtopics = max_subtopics
+        self.temperature_spread = temperature_spread
+
+    async def plan(
+        self,
+        generator: DatasetGenerator,
+        request: GenerationRequest,
+        shards: List[GenerationRequest]
+    ) -> List[GenerationRequest]:
+        """Condition each shard on its own subtopics, seed and temperature"""
+        if len(shards) < 2:
+            return shards
+
+        base_seed, subtopics = await self.settle(generator, request)
+        base_temperature = generator.sampling_temperature(request)
+
+        planned = []
+        for i, shard in enumerate(shards):
+            planned.append(dataclasses.replace(
+                shard,
+                # Round robin keeps the slices disjoint and evenly sized
+                subtopics=subtopics[i::len(shards)] or None,
+                seed=base_seed + i,
+                temperature=self._shard_temperature(base_temperature, i, len(shards)),
+            ))
+        return planned
+
+    async def settle(self, generator: DatasetGenerator, request: GenerationRequest) -> Tuple[int, List[str]]:
+        """The base seed and subtopics a request's batches are planned from, chosen unless the request sets them"""
+        subtopics = request.subtopics or await self.plan_subtopics(generator, request)
+        base_seed = request.seed if request.seed is not None else random.randrange(2 ** 31)
+        return base_seed, subtopics
+
+    async def plan_subtopics(self, generator: DatasetGenerator, request: GenerationRequest) -> List[str]:
+        """
+        Ask the model for distinct subtopics covering a request.
+
+        Planning only improves variety, so on failure batches are generated
+        without subtopics rather than failing the request.
+        """
+        count = min(self.max_subtopics, math.ceil(request.num_records / self.records_per_subtopic))
+        plan_request = dataclasses.replace(
+            request,
+            prompt=(
+                f"Distinct subtopics, categories or example entities that together span this dataset: "
+                f"{request.prompt}. They must not overlap, and each should lead to different records. "
+                f"Keep each one to a short phrase."
+            ),
+            num_records=count,
+            schema=_PLAN_SCHEMA,
+            subtopics=None,
+        )
+
+        try:
+            with span("plan"):
+                records = await generator.generate_dataset(plan_request)
+        except GenerationCancelled:
+            raise
+        except Exception:
+            return []
+
+        subtopics = {}
+        for record in records:
+            subtopic = self._subtopic(record)
+            if subtopic:
+                subtopics.setdefault(subtopic.casefold(), subtopic)
+        return list(subtopics.values())[:count]
+
+    def _shard_temperature(self, base: Optional[float], index: int, count: int) -> Optional[float]:
+        """Temperatures spread evenly across shards, clamped to a range every provider accepts"""
+        if base is None:
+            return None
+        offset = self.temperature_spread * (2 * index / (count - 1) - 1)
+        return round(min(1.0, max(0.0, base + offset)), 3)
+
+    @staticmethod
+    def _subtopic(record: Dict[str, Any]) -> Optional[str]:
+        """The subtopic of a planning record, models don't always use the requested key"""
+        value = record.get("subtopic")
+        if not isinstance(value, str):
+            value = next((value for value in record.values() if isinstance(value, str)), None)
+        return " ".join(value.split()) if value else None
@@ -0,0 +1,365 @@
+"""
+Lazy, random-access readers for generated datasets
+"""
+
+import csv
+import gzip
+import io
+import itertools
+import json
+import mmap
+import os
+import re
+import struct
+from abc import ABC, abstractmethod
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..generators.base import IncrementalJSONParser
+from ..config.settings import INDEX_SUFFIX
+
+class DatasetReader(ABC):
+    """
+    Abstract base class for readers of dataset files.
+
+    Readers iterate records lazily and support ``len()`` and indexing by
+    record number, so datasets larger than memory can be sampled or streamed.
+    Readers are used as context managers.
+    """
+
+    # Whether indexing is a direct lookup rather than a scan
+    random_access: bool = True
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        pass
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        index = self._normalize_index(index)
+        # Formats without an index have to be scanned
+        return next(itertools.islice(iter(self), index, None))
+
+    def slice(self, start: int, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Lazily iterate the records from ``start`` up to ``stop``"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(max(0, start), stop):
+            yield self[index]
+
+    def close(self) -> None:
+        pass
+
+    def _normalize_index(self, index: int) -> int:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError(f"Record index out of range for {self.path}")
+        return index
+
+    def __enter__(self) -> "DatasetReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+class _IndexedTextReader(DatasetReader):
+    """
+    Base class for uncompressed JSON text formats read through a memory map.
+
+    The byte span of every record is kept in a sidecar index next to the
+    file, built on first open and rebuilt when the file changes, so looking
+    up a record is a single slice of the map.
+    """
+
+    _MAGIC = b"DSIDX001"
+    _HEADER = struct.Struct("<8sQQ")  # magic, file size, modification time in ns
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # Empty files can't be mapped
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._spans = self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._spans) // 2
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self)):
+            yield self._record(index)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self._record(self._normalize_index(index))
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def _record(self, index: int) -> Dict[str, Any]:
+        start, end = self._spans[2 * index], self._spans[2 * index + 1]
+        return json.loads(self._map[start:end])
+
+    @abstractmethod
+    def _scan(self) -> Iterator[Tuple[int, int]]:
+        """Byte spans of the records in the file"""
+        pass
+
+    def _load_index(self) -> array:
+        """Read the sidecar index, rebuilding it if it is missing or stale"""
+        stat = os.stat(self.path)
+        header = self._HEADER.pack(self._MAGIC, stat.st_size, stat.st_mtime_ns)
+        index_path = self.path + INDEX_SUFFIX
+
+        try:
+            with open(index_path, "rb") as f:
+                if f.read(self._HEADER.size) == header:
+                    spans = array("Q")
+                    spans.frombytes(f.read())
+                    return spans
+        except OSError:
+            pass
+
+        spans = array("Q", (offset for span in self._scan() for offset in span))
+        try:
+            with open(index_path, "wb") as f:
+                f.write(header)
+                spans.tofile(f)
+        except OSError:
+            # Read-only directories still get an in-memory index
+            pass
+        return spans
+
+class JSONLReader(_IndexedTextReader):
+    """One JSON object per line"""
+
+    def _scan(self) -> Iterator[Tuple[int, int]]:
+        start, size = 0, len(self._map)
+        while start < size:
+            end = self._map.find(b"\n", start)
+            if end == -1:
+                end = size
+            if self._map[start:end].strip():
+                yield start, end
+            start = end + 1
+
+class JSONReader(_IndexedTextReader):
+    """JSON array of objects, pretty-printed or not"""
+
+    # Bytes that change the nesting depth or string state
+    _STRUCTURAL = re.compile(rb'[\[\]{}"\\]')
+
+    def _scan(self) -> Iterator[Tuple[int, int]]:
+        depth = 0
+        in_string = False
+        skip_to = 0  # position after an escaped character
+        start = 0
+        for match in self._STRUCTURAL.finditer(self._map):
+            position = match.start()
+            if position < skip_to:
+                continue
+            char = match.group()
+
+            if in_string:
+                if char == b"\\":
+                    skip_to = position + 2
+                elif char == b'"':
+                    in_string = False
+            elif char == b'"':
+                in_string = True
+            elif char in (b"{", b"["):
+                if depth == 1 and char == b"{":
+                    start = position
+                depth += 1
+            elif char in (b"}", b"]"):
+                depth -= 1
+                if depth == 1 and char == b"}":
+                    yield start, position + 1
+
+class _StreamReader(DatasetReader):
+    """Base class for formats that can only be read front to back"""
+
+    random_access = False
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._length: Optional[int] = None
+
+    def __len__(self) -> int:
+        if self._length is None:
+            self._length = sum(1 for _ in self)
+        return self._length
+
+    def slice(self, start: int, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        return itertools.islice(iter(self), max(0, start), stop)
+
+    def _open_text(self) -> io.TextIOBase:
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, "rt", encoding="utf-8", newline="")
+        return open(self.path, "r", encoding="utf-8", newline="")
+
+class GzipJSONLReader(_StreamReader):
+    """Gzip-compressed JSONL, decompressed as it is read"""
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with self._open_text() as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+class GzipJSONReader(_StreamReader):
+    """Gzip-compressed JSON array, decompressed in chunks as it is read"""
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        parser = IncrementalJSONParser()
+        with self._open_text() as f:
+            for chunk in iter(lambda: f.read(1 << 20), ""):
+                yield from parser.feed(chunk)
+
+class CSVReader(_StreamReader):
+    """
+    CSV with a header row.
+
+    Values that the CSV writer stored as JSON strings are decoded again,
+    everything else is returned as text.
+    """
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with self._open_text() as f:
+            for row in csv.DictReader(f):
+                yield {key: self._decode(value) for key, value in row.items()}
+
+    @staticmethod
+    def _decode(value: str) -> Any:
+        if value[:1] in ("{", "["):
+            try:
+                return json.loads(value)
+            except ValueError:
+                pass
+        return value
+
+class _ColumnarReader(DatasetReader):
+    """Base class for Arrow-based formats, read one memory-mapped row group at a time"""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError(f"pyarrow is required to read {os.path.basename(path)}: pip install pyarrow")
+
+        self._pa = pyarrow
+        self._open()
+        # First record of each row group, for locating records by index
+        self._starts: List[int] = list(itertools.accumulate(
+            (self._group_rows(group) for group in range(self._num_groups())), initial=0
+        ))
+        self._cached_group: Optional[int] = None
+        self._cached_rows: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return self._starts[-1]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for group in range(self._num_groups()):
+            yield from self._read_group(group).to_pylist()
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        index = self._normalize_index(index)
+        group = self._group_of(index)
+        if group != self._cached_group:
+            # Neighbouring lookups usually hit the same row group
+            self._cached_rows = self._read_group(group).to_pylist()
+            self._cached_group = group
+        return self._cached_rows[index - self._starts[group]]
+
+    def _group_of(self, index: int) -> int:
+        low, high = 0, len(self._starts) - 2
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self._starts[middle] <= index:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    @abstractmethod
+    def _open(self) -> None:
+        pass
+
+    @abstractmethod
+    def _num_groups(self) -> int:
+        pass
+
+    @abstractmethod
+    def _group_rows(self, group: int) -> int:
+        pass
+
+    @abstractmethod
+    def _read_group(self, group: int) -> Any:
+        pass
+
+class ParquetReader(_ColumnarReader):
+    """Parquet file, row groups located through the file's own metadata"""
+
+    def _open(self) -> None:
+        import pyarrow.parquet as pq
+        self._parquet = pq.ParquetFile(self.path, memory_map=True)
+
+    def _num_groups(self) -> int:
+        return self._parquet.num_row_groups
+
+    def _group_rows(self, group: int) -> int:
+        return self._parquet.metadata.row_group(group).num_rows
+
+    def _read_group(self, group: int) -> Any:
+        return self._parquet.read_row_group(group)
+
+    def close(self) -> None:
+        self._parquet.close()
+
+class ArrowReader(_ColumnarReader):
+    """Arrow IPC file, record batches are read zero-copy from the memory map"""
+
+    def _open(self) -> None:
+        self._source = self._pa.memory_map(self.path, "r")
+        self._ipc = self._pa.ipc.open_file(self._source)
+
+    def _num_groups(self) -> int:
+        return self._ipc.num_record_batches
+
+    def _group_rows(self, group: int) -> int:
+        return self._ipc.get_batch(group).num_rows
+
+    def _read_group(self, group: int) -> Any:
+        return self._ipc.get_batch(group)
+
+    def close(self) -> None:
+        self._source.close()
+
+# Readers by file suffix, longest suffixes are matched first
+READERS = {
+    ".jsonl.gz": GzipJSONLReader,
+    ".json.gz": GzipJSONReader,
+    ".csv.gz": CSVReader,
+    ".jsonl": JSONLReader,
+    ".json": JSONReader,
+    ".csv": CSVReader,
+    ".parquet": ParquetReader,
+    ".arrow": ArrowReader,
+}
+
+def open_reader(path: str) -> DatasetReader:
+    """Create the reader for a dataset file, chosen by its suffix"""
+    for suffix in sorted(READERS, key=len, reverse=True):
+        if path.endswith(suffix):
+            return READERS[suffix](path)
+    raise ValueError(f"Unknown dataset format: {os.path.basename(path)}")
@@ -0,0 +1,128 @@
+"""
+Content-addressed on-disk cache of generated datasets
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..models.request import GenerationRequest
+from ..generators.base import DatasetGenerator
+from ..config.settings import CACHE_DIR, CACHE_MAX_BYTES, CACHE_TTL_SECONDS
+
+# Request fields that don't change the generated records
+_KEY_EXCLUDED_FIELDS = ("api_key", "use_cache", "timeout_seconds", "output_format", "compression")
+
+class ResponseCache:
+    """
+    Caches generated records keyed on a hash of the normalized request.
+
+    Each entry is a JSONL file named after its key whose first line holds the
+    entry metadata. Entries expire after a TTL, and the least recently used
+    entries are evicted once the cache grows beyond its size limit. File
+    modification times track recency, so reads touch the entry.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        max_bytes: int = CACHE_MAX_BYTES,
+        ttl_seconds: float = CACHE_TTL_SECONDS
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, request: GenerationRequest, generator: DatasetGenerator) -> str:
+        """Hash the output-relevant parts of a request and generator settings"""
+        payload = dataclasses.asdict(request)
+        for name in _KEY_EXCLUDED_FIELDS:
+            payload.pop(name)
+        # Whitespace and case differences don't change what gets generated
+        payload["prompt"] = " ".join(request.prompt.split()).casefold()
+        # Kept apart, the generator's settings share names with request fields
+        payload["generator"] = generator.settings_fingerprint()
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached records for a key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if time.time() - header["created_at"] > self.ttl_seconds:
+                    raise LookupError("expired")
+                records = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return None
+        except (LookupError, KeyError, ValueError):
+            # Expired or unreadable entries are treated as misses
+            self._remove(path)
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return records
+
+    def put(self, key: str, records: List[Dict[str, Any]]) -> None:
+        """Store records under a key, then enforce the size limit"""
+        header = {"created_at": time.time(), "count": len(records)}
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(json.dumps(header) + "\n")
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            # Atomic rename so readers never see a partially written entry
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            self._remove(tmp_path)
+            raise
+
+        self._evict()
+
+    def clear(self) -> None:
+        """Remove every cache entry"""
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".jsonl"):
+                self._remove(entry.path)
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits its size limit"""
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".jsonl"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.jsonl")
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
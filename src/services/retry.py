@@ -0,0 +1,59 @@
+"""
+Retry pacing and per-provider retry budgets
+"""
+
+import random
+import threading
+import time
+from typing import Dict
+
+from ..config.settings import (
+    RETRY_BACKOFF_BASE_SECONDS,
+    RETRY_BACKOFF_MAX_SECONDS,
+    RETRY_BUDGET_PER_MINUTE
+)
+
+def backoff_delay(
+    attempt: int,
+    base: float = RETRY_BACKOFF_BASE_SECONDS,
+    cap: float = RETRY_BACKOFF_MAX_SECONDS
+) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class RetryBudget:
+    """
+    Token bucket capping how many retries a provider may receive.
+
+    The budget is shared by every request to the provider, so a failing
+    provider can't be flooded with follow-up generations.
+    """
+
+    def __init__(self, retries_per_minute: float):
+        self.capacity = max(1.0, retries_per_minute)
+        self.refill_rate = retries_per_minute / 60
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Spend one retry if the budget allows it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+            self._updated = now
+
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+_budgets: Dict[str, RetryBudget] = {}
+_budgets_lock = threading.Lock()
+
+def get_retry_budget(model_type: str) -> RetryBudget:
+    """The shared retry budget for a provider"""
+    with _budgets_lock:
+        if model_type not in _budgets:
+            _budgets[model_type] = RetryBudget(RETRY_BUDGET_PER_MINUTE.get(model_type, 10))
+        return _budgets[model_type]
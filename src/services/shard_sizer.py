@@ -0,0 +1,112 @@
+"""
+Adaptive sizing of the batches a request is split into
+"""
+
+import dataclasses
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from ..models.request import GenerationRequest
+from ..generators.base import DatasetGenerator
+from ..config.settings import (
+    SHARD_SIZING_MAX_PROMPTS,
+    SHARD_SIZING_SMOOTHING,
+    SHARD_TOKEN_HEADROOM,
+    TOKENS_PER_RECORD_ESTIMATE
+)
+
+# Budgets never go below this, short completions still need room for the array around the records
+_MIN_BUDGET_TOKENS = 256
+
+class ShardSizer:
+    """
+    Sizes batches from the output tokens their records actually take.
+
+    Records of one prompt and schema take about the same number of tokens,
+    which can be far from the fixed estimate. The sizer keeps a smoothed
+    tokens/record average per model and prompt, fed by the usage reported
+    for completed batches. Batches then request as many records as fit the
+    model's output limit with some headroom, and once a prompt has been seen
+    each call's output budget is lowered to what its records need, so a
+    runaway completion stops early instead of holding a local batch or a
+    rate limit reservation.
+    """
+
+    def __init__(
+        self,
+        smoothing: float = SHARD_SIZING_SMOOTHING,
+        headroom: float = SHARD_TOKEN_HEADROOM,
+        max_prompts: int = SHARD_SIZING_MAX_PROMPTS
+    ):
+        self.smoothing = smoothing
+        self.headroom = headroom
+        self.max_prompts = max_prompts
+        self._prompts: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._models: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def tokens_per_record(self, generator: DatasetGenerator, request: GenerationRequest) -> Tuple[float, bool]:
+        """
+        Expected output tokens per record of a request.
+
+        Returns:
+            Tuple[float, bool]: (tokens per record, whether it was observed for this prompt)
+        """
+        key = self._key(generator, request)
+        with self._lock:
+            if key in self._prompts:
+                self._prompts.move_to_end(key)
+                return self._prompts[key], True
+            # Unseen prompts start from what the model needed for other prompts
+            return self._models.get(key[0], TOKENS_PER_RECORD_ESTIMATE), False
+
+    def batch_size(self, generator: DatasetGenerator, request: GenerationRequest) -> int:
+        """Records requested per completion"""
+        tokens_per_record, _ = self.tokens_per_record(generator, request)
+        return generator.records_per_batch(tokens_per_record)
+
+    def budget(self, generator: DatasetGenerator, request: GenerationRequest) -> GenerationRequest:
+        """The request with its output budget lowered to what its records are expected to need"""
+        tokens_per_record, observed = self.tokens_per_record(generator, request)
+        if not observed:
+            # Other prompts are no guide to this one's records, keep the full limit
+            return request
+
+        needed = math.ceil(request.num_records * tokens_per_record * (1 + self.headroom))
+        max_tokens = min(generator.output_token_limit(request), max(_MIN_BUDGET_TOKENS, needed))
+        return dataclasses.replace(request, max_tokens=max_tokens)
+
+    def observe(self, generator: DatasetGenerator, request: GenerationRequest, records: int, output_tokens: int) -> None:
+        """Learn from the records a completion returned and the output tokens it used"""
+        if output_tokens <= 0:
+            return
+        # A completion cut off by its budget used at least this much per record
+        truncated = output_tokens >= generator.output_token_limit(request)
+        if not records and not truncated:
+            return
+
+        sample = output_tokens / max(records, 1)
+        key = self._key(generator, request)
+        with self._lock:
+            self._prompts[key] = self._smooth(self._prompts.get(key), sample)
+            self._prompts.move_to_end(key)
+            while len(self._prompts) > self.max_prompts:
+                self._prompts.popitem(last=False)
+            self._models[key[0]] = self._smooth(self._models.get(key[0]), sample)
+
+    def _smooth(self, average: Optional[float], sample: float) -> float:
+        if average is None:
+            return sample
+        return average + self.smoothing * (sample - average)
+
+    @staticmethod
+    def _key(generator: DatasetGenerator, request: GenerationRequest) -> Tuple[str, str]:
+        """Model and normalized prompt, the schema shapes the records as much as the prompt does"""
+        model = getattr(generator, "model_name", None) or type(generator).__name__
+        prompt = " ".join(request.prompt.split()).casefold()
+        if request.schema:
+            prompt += "\n" + json.dumps(request.schema, sort_keys=True, ensure_ascii=False)
+        return model, prompt
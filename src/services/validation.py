@@ -0,0 +1,192 @@
+"""
+Schema inference and per-record validation of generated datasets
+"""
+
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+
+from .writers import JSONLWriter
+from ..config.settings import SCHEMA_SAMPLE_SIZE
+
+# JSON type names by exact Python type (bool must not count as an integer)
+JSON_TYPES: Dict[type, str] = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    type(None): "null",
+    dict: "object",
+    list: "array",
+}
+
+# Returns None for a valid record, otherwise a description of the problem
+RecordValidator = Callable[[Any], Optional[str]]
+
+@dataclass
+class RecordSchema:
+    """
+    Flat schema for dataset records: allowed JSON types per field.
+
+    Can be inferred from sample records or built from a JSON Schema with
+    top-level ``properties``, ``required`` and ``additionalProperties``.
+    """
+    properties: Dict[str, FrozenSet[str]]
+    required: FrozenSet[str] = frozenset()
+    additional_properties: bool = False
+
+    @classmethod
+    def infer(cls, records: List[Dict[str, Any]]) -> "RecordSchema":
+        """
+        Infer a schema from sample records.
+
+        Fields present in at least half of the samples make up the schema, so a
+        minority of drifting records doesn't widen it. Fields present in every
+        sample are required.
+        """
+        samples = [record for record in records if isinstance(record, dict)]
+        field_counts = Counter(key for record in samples for key in record)
+        threshold = len(samples) / 2
+
+        properties = {}
+        for key, count in field_counts.items():
+            if count >= threshold:
+                types = {JSON_TYPES.get(type(record[key]), "unknown") for record in samples if key in record}
+                # A handful of whole numbers doesn't mean the field can't hold decimals
+                if "integer" in types:
+                    types.add("number")
+                properties[key] = frozenset(types)
+
+        required = frozenset(key for key in properties if field_counts[key] == len(samples))
+        return cls(properties=properties, required=required)
+
+    @classmethod
+    def from_json_schema(cls, schema: Dict[str, Any]) -> "RecordSchema":
+        """Build a schema from a JSON Schema object definition"""
+        properties = {}
+        for key, definition in schema.get("properties", {}).items():
+            types = definition.get("type", list(set(JSON_TYPES.values())))
+            properties[key] = frozenset([types] if isinstance(types, str) else types)
+
+        # JSON Schema allows extra fields unless told otherwise, a subschema allows them too
+        additional = schema.get("additionalProperties", True)
+        return cls(
+            properties=properties,
+            required=frozenset(schema.get("required", [])),
+            additional_properties=isinstance(additional, dict) or bool(additional)
+        )
+
+    def to_json_schema(self) -> Dict[str, Any]:
+        """Describe the schema as a JSON Schema object definition"""
+        return {
+            "type": "object",
+            "properties": {
+                key: {"type": sorted(types)[0] if len(types) == 1 else sorted(types)}
+                for key, types in self.properties.items()
+            },
+            "required": sorted(self.required),
+            "additionalProperties": self.additional_properties,
+        }
+
+    def compile(self) -> RecordValidator:
+        """Compile the schema into a fast validation function"""
+        # Integers are valid wherever numbers are
+        allowed = {
+            key: types | {"integer"} if "number" in types else types
+            for key, types in self.properties.items()
+        }
+        required = self.required
+        additional = self.additional_properties
+        type_names = JSON_TYPES
+
+        def validate(record: Any) -> Optional[str]:
+            if type(record) is not dict:
+                return "record is not an object"
+
+            missing = required - record.keys()
+            if missing:
+                return f"missing fields: {', '.join(sorted(missing))}"
+
+            for key, value in record.items():
+                types = allowed.get(key)
+                if types is None:
+                    if not additional:
+                        return f"unexpected field '{key}'"
+                elif type_names.get(type(value)) not in types:
+                    return f"field '{key}' has type {type_names.get(type(value), type(value).__name__)}"
+            return None
+
+        return validate
+
+class QuarantineWriter:
+    """Collects rejected records in a JSONL file, created on first use"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writer: Optional[JSONLWriter] = None
+
+    @property
+    def count(self) -> int:
+        return self._writer.records_written if self._writer is not None else 0
+
+    def write(self, record: Any, error: str) -> None:
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._writer = JSONLWriter(self.path)
+        self._writer.write({"error": error, "record": record})
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+@dataclass
+class ValidationStage:
+    """
+    Streaming validation between the generator and the writer.
+
+    Without a user-supplied schema, the first ``sample_size`` records are held
+    back until a schema has been inferred from them; afterwards each record is
+    checked as it arrives. Rejected records are passed to ``on_reject``.
+    """
+    schema: Optional[RecordSchema] = None
+    sample_size: int = SCHEMA_SAMPLE_SIZE
+    on_reject: Optional[Callable[[Any, str], None]] = None
+    accepted: int = 0
+    rejected: int = 0
+    _validator: Optional[RecordValidator] = field(default=None, init=False, repr=False)
+    _sample: List[Any] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.schema is not None:
+            self._validator = self.schema.compile()
+
+    def process(self, record: Any) -> List[Dict[str, Any]]:
+        """Validate a record, returning the records that are ready to be written"""
+        if self._validator is None:
+            self._sample.append(record)
+            if len(self._sample) < self.sample_size:
+                return []
+            return self.flush()
+
+        return [record] if self._check(record) else []
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Infer the schema from whatever has been sampled and release it"""
+        if self._validator is None and self._sample:
+            self.schema = RecordSchema.infer(self._sample)
+            self._validator = self.schema.compile()
+
+        sample, self._sample = self._sample, []
+        return [record for record in sample if self._check(record)]
+
+    def _check(self, record: Any) -> bool:
+        error = self._validator(record)
+        if error is None:
+            self.accepted += 1
+            return True
+
+        self.rejected += 1
+        if self.on_reject is not None:
+            self.on_reject(record, error)
+        return False
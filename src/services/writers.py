@@ -0,0 +1,398 @@
+"""
+Streaming dataset writers for the supported output formats
+"""
+
+import csv
+import gzip
+import itertools
+import json
+from abc import ABC, abstractmethod
+from typing import IO, Any, Dict, Iterable, List, Optional, Type
+
+from ..config.settings import PARQUET_ROW_GROUP_SIZE
+
+class DatasetWriter(ABC):
+    """
+    Abstract base class for writers that append records as they are produced.
+
+    Writers are used as context managers; the output file is complete once the
+    writer has been closed.
+    """
+
+    extension: str = ""
+    compressions: tuple = (None,)
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        if compression not in self.compressions:
+            supported = ", ".join(str(c) for c in self.compressions)
+            raise ValueError(f"Unsupported compression '{compression}' for {self.extension} (supported: {supported})")
+
+        self.path = path
+        self.compression = compression
+        self.records_written = 0
+
+    @abstractmethod
+    def write(self, record: Dict[str, Any]) -> None:
+        """Append a single record"""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush buffered records and finish the file"""
+        pass
+
+    def write_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Append several records"""
+        for record in records:
+            self.write(record)
+
+    def __enter__(self) -> "DatasetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+class _TextWriter(DatasetWriter):
+    """Base class for line-oriented text formats with optional gzip compression"""
+
+    compressions = (None, "gzip")
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        super().__init__(path, compression)
+        self._file: IO[str] = self._open(path, compression)
+
+    @staticmethod
+    def _open(path: str, compression: Optional[str]) -> IO[str]:
+        if compression == "gzip":
+            return gzip.open(path, "wt", encoding="utf-8", newline="")
+        return open(path, "w", encoding="utf-8", newline="")
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+class JSONWriter(_TextWriter):
+    """Pretty-printed JSON array, written incrementally"""
+
+    extension = "json"
+
+    def write(self, record: Dict[str, Any]) -> None:
+        prefix = "[\n" if self.records_written == 0 else ",\n"
+        # Indent each record as json.dump(dataset, indent=2) would
+        body = json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        self._file.write(prefix + "  " + body)
+        self.records_written += 1
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.write("\n]" if self.records_written else "[]")
+        super().close()
+
+class JSONLWriter(_TextWriter):
+    """One compact JSON object per line, safe to append to"""
+
+    extension = "jsonl"
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.records_written += 1
+
+class CSVWriter(_TextWriter):
+    """
+    CSV with a header taken from the first record.
+
+    Nested values are stored as JSON strings. Fields that only appear in later
+    records are dropped, since the header has already been written.
+    """
+
+    extension = "csv"
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        super().__init__(path, compression)
+        self._writer: Optional[csv.DictWriter] = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(record), extrasaction="ignore")
+            self._writer.writeheader()
+
+        row = {
+            key: json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+            for key, value in record.items()
+        }
+        self._writer.writerow(row)
+        self.records_written += 1
+
+def _import_pyarrow(purpose: str) -> Any:
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(f"pyarrow is required for {purpose}: pip install pyarrow")
+    return pyarrow
+
+def _as_text(value: Any) -> Optional[str]:
+    """Value of a column with conflicting types, nested and non-string values are stored as JSON"""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+def _record_table(pa: Any, rows: List[Dict[str, Any]]) -> Any:
+    """
+    Arrow table of records, with a column for every field of any record.
+
+    Columns whose values can't share a type, e.g. numbers and strings, are
+    stored as JSON text rather than failing the whole table.
+    """
+    names = list(dict.fromkeys(key for row in rows for key in row))
+    columns = {}
+    for name in names:
+        values = [row.get(name) for row in rows]
+        try:
+            columns[name] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            columns[name] = pa.array([_as_text(value) for value in values], pa.large_string())
+    return pa.table(columns)
+
+def _widen_type(pa: Any, old: Any, new: Any) -> Any:
+    """Narrowest type holding the values of both types, JSON text when they conflict"""
+    if old == new:
+        return old
+    try:
+        # Promotes null to anything, integers to doubles and merges struct fields
+        return pa.unify_schemas(
+            [pa.schema([("value", old)]), pa.schema([("value", new)])], promote_options="permissive"
+        ).field("value").type
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return pa.large_string()
+
+def _widen_schema(pa: Any, old: Any, new: Any) -> Any:
+    """Schema covering the columns of both schemas, fields only in ``new`` are appended"""
+    fields = [
+        pa.field(field.name, _widen_type(pa, field.type, new.field(field.name).type))
+        if field.name in new.names else field
+        for field in old
+    ]
+    fields.extend(field for field in new if field.name not in old.names)
+    return pa.schema(fields)
+
+def _settle_type(pa: Any, arrow_type: Any) -> Any:
+    """
+    Type a column keeps for the rest of the file, given the values of a sample.
+
+    Columns that were all null become strings and integers become doubles, a
+    handful of whole numbers doesn't mean the field can't hold decimals.
+    """
+    if pa.types.is_null(arrow_type):
+        return pa.string()
+    if pa.types.is_integer(arrow_type):
+        return pa.float64()
+    if pa.types.is_struct(arrow_type):
+        return pa.struct([
+            pa.field(field.name, _settle_type(pa, field.type))
+            for field in (arrow_type.field(i) for i in range(arrow_type.num_fields))
+        ])
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        return pa.list_(_settle_type(pa, arrow_type.value_type))
+    return arrow_type
+
+def _column_table(pa: Any, rows: List[Dict[str, Any]], schema: Any) -> Any:
+    """
+    Arrow table of records in a fixed schema.
+
+    Missing fields are null and fields outside the schema are dropped. Text
+    columns store other values as JSON.
+
+    Raises:
+        pyarrow.ArrowInvalid: If a value can't be represented in its column's
+            type, e.g. a string in a number column or an integer beyond 2**53.
+    """
+    columns = []
+    for field in schema:
+        values = [row.get(field.name) for row in rows]
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            columns.append(pa.array([_as_text(value) for value in values], field.type))
+            continue
+        try:
+            # Safe casts raise instead of truncating
+            columns.append(pa.array(values).cast(field.type))
+        except pa.ArrowNotImplementedError:
+            # e.g. structs with a different set of fields
+            columns.append(pa.array(values, field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+def json_schema_to_arrow(json_schema: Dict[str, Any]) -> Optional[Any]:
+    """
+    Arrow schema for records described by a JSON Schema object definition.
+
+    Strings, integers, numbers and booleans map to their Arrow types, nested
+    and multi-typed fields are stored as JSON text. Returns None when the
+    schema has no ``properties`` to go by.
+    """
+    properties = json_schema.get("properties")
+    if not properties:
+        return None
+
+    pa = _import_pyarrow("columnar output")
+    scalar_types = {
+        ("string",): pa.string(),
+        ("integer",): pa.int64(),
+        ("number",): pa.float64(),
+        ("integer", "number"): pa.float64(),
+        ("boolean",): pa.bool_(),
+    }
+    fields = []
+    for name, definition in properties.items():
+        types = definition.get("type") if isinstance(definition, dict) else None
+        types = [types] if isinstance(types, str) else list(types or [])
+        key = tuple(sorted(set(types) - {"null"}))
+        fields.append(pa.field(name, scalar_types.get(key, pa.large_string())))
+    return pa.schema(fields)
+
+def infer_schema(records: Iterable[Dict[str, Any]]) -> Any:
+    """Arrow schema covering every record, for columnar writers to start from"""
+    pa = _import_pyarrow("schema inference")
+    schema = None
+    rows: List[Dict[str, Any]] = []
+    for record in itertools.chain(records, [None]):
+        if record is not None:
+            rows.append(record)
+        if rows and (record is None or len(rows) >= PARQUET_ROW_GROUP_SIZE):
+            group_schema = _record_table(pa, rows).schema
+            schema = group_schema if schema is None else _widen_schema(pa, schema, group_schema)
+            rows = []
+    if schema is None:
+        return pa.schema([])
+    # Fields that were always null still need a type
+    return pa.schema([
+        pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field for field in schema
+    ])
+
+class _ColumnarWriter(DatasetWriter):
+    """
+    Base class for Arrow-based formats that buffer records into row groups.
+
+    The schema is fixed when the first row group is written, from a schema
+    given up front plus any fields the first group adds, so memory stays at
+    one row group whatever the size of the file. Later groups are cast to it:
+    missing fields are null and new fields are dropped, as with CSV headers.
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None, schema: Optional[Any] = None):
+        super().__init__(path, compression)
+        self._pa = _import_pyarrow(f"{self.extension} output")
+        self._rows: List[Dict[str, Any]] = []
+        self._schema = schema
+        self._sink = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._rows.append(record)
+        self.records_written += 1
+        if len(self._rows) >= PARQUET_ROW_GROUP_SIZE:
+            self._flush()
+
+    def close(self) -> None:
+        if self._rows or self._sink is None:
+            self._flush()
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def _flush(self) -> None:
+        """Write buffered records as one row group"""
+        if self._sink is None:
+            self._schema = self._fix_schema()
+            self._sink = self._open_sink(self._schema)
+
+        self._write_table(_column_table(self._pa, self._rows, self._schema))
+        self._rows = []
+
+    def _fix_schema(self) -> Any:
+        """The given schema, with columns for fields that only the first row group has"""
+        pa = self._pa
+        sample = pa.schema([
+            pa.field(field.name, _settle_type(pa, field.type))
+            for field in _record_table(pa, self._rows).schema
+        ])
+        if self._schema is None:
+            return sample
+        return pa.schema(list(self._schema) + [field for field in sample if field.name not in self._schema.names])
+
+    @abstractmethod
+    def _open_sink(self, schema: Any) -> Any:
+        pass
+
+    @abstractmethod
+    def _write_table(self, table: Any) -> None:
+        pass
+
+class ParquetWriter(_ColumnarWriter):
+    """Columnar Parquet file with per-column compression"""
+
+    extension = "parquet"
+    compressions = (None, "snappy", "gzip", "zstd", "brotli", "lz4")
+
+    def _open_sink(self, schema: Any) -> Any:
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self.path, schema, compression=self.compression or "none")
+
+    def _write_table(self, table: Any) -> None:
+        self._sink.write_table(table, row_group_size=PARQUET_ROW_GROUP_SIZE)
+
+class ArrowWriter(_ColumnarWriter):
+    """Arrow IPC (Feather v2) file, memory-mappable for fast reads"""
+
+    extension = "arrow"
+    compressions = (None, "lz4", "zstd")
+
+    def _open_sink(self, schema: Any) -> Any:
+        options = self._pa.ipc.IpcWriteOptions(compression=self.compression)
+        return self._pa.ipc.new_file(self.path, schema, options=options)
+
+    def _write_table(self, table: Any) -> None:
+        self._sink.write_table(table, max_chunksize=PARQUET_ROW_GROUP_SIZE)
+
+WRITERS: Dict[str, Type[DatasetWriter]] = {
+    "json": JSONWriter,
+    "jsonl": JSONLWriter,
+    "csv": CSVWriter,
+    "parquet": ParquetWriter,
+    "arrow": ArrowWriter,
+}
+
+# File suffixes produced by the writers, including compressed variants
+OUTPUT_EXTENSIONS = tuple(
+    suffix
+    for writer_class in WRITERS.values()
+    for suffix in (f".{writer_class.extension}", f".{writer_class.extension}.gz")
+)
+
+def output_extension(output_format: str, compression: Optional[str] = None) -> str:
+    """File suffix for an output format, e.g. '.jsonl.gz'"""
+    writer_class = WRITERS[output_format]
+    suffix = f".{writer_class.extension}"
+    # Text formats are compressed as a whole file, columnar ones internally
+    if compression == "gzip" and issubclass(writer_class, _TextWriter):
+        suffix += ".gz"
+    return suffix
+
+def is_columnar(output_format: str) -> bool:
+    """Whether an output format is Arrow-based and can start from a known schema"""
+    return issubclass(WRITERS[output_format], _ColumnarWriter)
+
+def create_writer(
+    output_format: str, 
+    path: str, 
+    compression: Optional[str] = None, 
+    schema: Optional[Any] = None
+) -> DatasetWriter:
+    """
+    Create the writer for an output format
+    
+    ``schema`` is an Arrow schema for columnar formats to start from, so
+    records of a known shape keep their types past the first row group.
+    """
+    if output_format not in WRITERS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    if schema is not None and is_columnar(output_format):
+        return WRITERS[output_format](path, compression, schema=schema)
+    return WRITERS[output_format](path, compression)
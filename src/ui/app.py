@@ -3,17 +3,28 @@ Gradio UI application for the dataset generator.
 """
 
 import asyncio
+import json
 import os
-from typing import Any, Tuple
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 import gradio as gr
 
 from ..models.request import GenerationRequest
 from ..services.dataset_service import DatasetService
+from ..services.job_manager import Job, JobManager, JobQueueFullError, JobStatus
 from ..generators.factory import GeneratorFactory
+from ..monitoring.metrics import start_metrics_server
 from ..config.settings import (
+    DEFAULT_OUTPUT_FORMAT,
     DEFAULT_RECORDS, 
+    JOB_POLL_INTERVAL_SECONDS,
     MAX_RECORDS, 
+    METRICS_ENABLED,
+    METRICS_HOST,
+    METRICS_PORT,
     MIN_RECORDS,
+    OUTPUT_FORMATS,
+    PREVIEW_ROWS,
     SERVER_HOST,
     SERVER_PORT
 )
@@ -23,57 +34,138 @@ class DatasetGeneratorApp:
     
     def __init__(self):
         self.service = DatasetService()
+        self.jobs = JobManager(self.service)
     
     def _create_generation_request(
         self, 
         prompt: str, 
         num_records: int, 
         model_type: str, 
-        api_key: str
+        api_key: str,
+        use_cache: bool = True,
+        output_format: str = DEFAULT_OUTPUT_FORMAT
     ) -> GenerationRequest:
         """Create a generation request from UI inputs"""
         return GenerationRequest(
             prompt=prompt.strip(),
             num_records=int(num_records),
             model_type=model_type,
-            api_key=api_key.strip() if api_key else None
+            api_key=api_key.strip() if api_key else None,
+            use_cache=bool(use_cache),
+            output_format=output_format
         )
     
-    async def _generate_dataset_async(
+    async def _generate_dataset_job(
         self, 
         prompt: str, 
         num_records: int, 
         model_type: str, 
-        api_key: str
-    ) -> Tuple[str, str]:
-        """Generate dataset asynchronously"""
+        api_key: str,
+        use_cache: bool,
+        output_format: str
+    ) -> AsyncIterator[Tuple[Any, str, Any, str]]:
+        """Submit a generation job and stream its progress and latest records until it finishes"""
         try:
-            request = self._create_generation_request(prompt, num_records, model_type, api_key)
-            return await self.service.generate_and_save_dataset(request)
+            request = self._create_generation_request(
+                prompt, num_records, model_type, api_key, use_cache, output_format
+            )
+            job = self.jobs.submit(request)
         except ValueError as e:
-            return "", f"❌ Validation Error: {str(e)}"
-        except Exception as e:
-            return "", f"❌ Unexpected Error: {str(e)}"
+            yield (*self._handle_file_output("", f"❌ Validation Error: {str(e)}"), self._format_preview([]), "")
+            return
+        except JobQueueFullError as e:
+            yield (*self._handle_file_output("", f"❌ {str(e)}"), self._format_preview([]), "")
+            return
+        
+        # Closing the stream must reach the job's cleanup right away
+        async with aclosing(self._follow_job(job)) as updates:
+            async for update in updates:
+                yield update
     
-    def _generate_dataset_wrapper(
-        self, 
-        prompt: str, 
-        num_records: int, 
-        model_type: str, 
-        api_key: str
-    ) -> Tuple[str, str]:
-        """Wrapper to run async generation in sync context"""
-        filepath, status = asyncio.run(self._generate_dataset_async(prompt, num_records, model_type, api_key))
-        print("DEBUG: filepath returned =", filepath)  # Add this line
-        print("DEBUG: status =", status)
+    async def _resume_dataset_job(self, job_id: str, api_key: str) -> AsyncIterator[Tuple[Any, str, Any, str]]:
+        """Resume a stopped job and stream its progress like a new one"""
+        try:
+            if not job_id:
+                raise KeyError("Choose a stopped job to resume")
+            job = self.jobs.resume(job_id, api_key.strip() if api_key else None)
+        except (KeyError, ValueError, JobQueueFullError) as e:
+            message = e.args[0] if e.args else str(e)
+            yield (*self._handle_file_output("", f"❌ {message}"), self._format_preview([]), "")
+            return
         
-        # Ensure we return proper values for Gradio
-        if filepath and filepath.strip():
-            if os.path.exists(filepath):
-                return filepath, status
-            else:
-                return "", f"❌ Error: Generated file not found at {filepath}"
-        return "", status
+        async with aclosing(self._follow_job(job)) as updates:
+            async for update in updates:
+                yield update
+    
+    async def _follow_job(self, job: Job) -> AsyncIterator[Tuple[Any, str, Any, str]]:
+        """Stream a job's progress and latest records until it finishes"""
+        # Poll the job without holding a worker thread
+        try:
+            while not job.done:
+                preview = self._format_preview(list(job.preview))
+                yield (*self._handle_file_output("", self._format_job_progress(job)), preview, job.job_id)
+                await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+        finally:
+            # Nobody is waiting for the dataset if the page was closed, don't let it hold a model slot
+            self.jobs.cancel(job.job_id, reason="abandoned")
+        
+        filepath, status = job.filepath, job.message
+        if filepath and not os.path.exists(filepath):
+            filepath, status = "", f"❌ Error: Generated file not found at {filepath}"
+        yield (*self._handle_file_output(filepath, status), self._format_preview(list(job.preview)), "")
+    
+    def _resumable_jobs(self) -> Any:
+        """Dropdown choices for the jobs that can be resumed"""
+        choices = []
+        for job_id in self.service.list_resumable_jobs():
+            try:
+                request = self.service.checkpoint_request(job_id)
+            except (OSError, ValueError, TypeError):
+                continue
+            prompt = request.prompt if len(request.prompt) <= 40 else request.prompt[:40] + "..."
+            choices.append((f"{job_id[:8]} · {request.num_records} records · {prompt}", job_id))
+        return gr.update(choices=choices, value=None)
+    
+    def _cancel_job(self, job_id: str) -> str:
+        """Stop the job started from this page"""
+        if job_id and self.jobs.cancel(job_id):
+            return f"🛑 Cancelling job {job_id[:8]}..."
+        return "Nothing to cancel"
+    
+    def _format_job_progress(self, job: Job) -> str:
+        """Describe the progress of a pending job"""
+        if job.status == JobStatus.QUEUED:
+            position = self.jobs.queue_position(job) + 1
+            return f"⏳ Queued (position {position}), job {job.job_id[:8]}"
+        
+        progress = f"{job.records_generated}/{job.request.num_records} records"
+        rate, eta = job.records_per_second, job.eta_seconds
+        if rate is not None:
+            progress += f" ({rate:.1f} records/s, about {self._format_duration(eta)} left)"
+        return f"⚙️ Generating... {progress}, job {job.job_id[:8]}"
+    
+    @staticmethod
+    def _format_duration(seconds: float) -> str:
+        minutes, seconds = divmod(int(round(seconds)), 60)
+        return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+    
+    def _format_preview(self, records: Iterable[Dict[str, Any]]) -> Optional[Dict[str, List]]:
+        """Table of the latest generated records, newest first"""
+        rows = list(records)[-PREVIEW_ROWS:][::-1]
+        if not rows:
+            return None
+        
+        # Columns in the order fields first appear
+        headers = list(dict.fromkeys(key for row in rows for key in row))
+        data = [
+            [
+                value if value is None or isinstance(value, (str, int, float, bool)) 
+                else json.dumps(value, ensure_ascii=False)
+                for value in (row.get(header) for header in headers)
+            ]
+            for row in rows
+        ]
+        return {"headers": headers, "data": data}
     
     def _update_api_key_visibility(self, model_type: str) -> Any:
         """Update API key input visibility based on model selection"""
@@ -139,12 +231,28 @@ class DatasetGeneratorApp:
                         info="Required for OpenAI and Claude models"
                     )
                     
-                    generate_btn = gr.Button(
-                        "🚀 Generate Dataset", 
-                        variant="primary", 
-                        size="lg",
-                        elem_classes=["generate-btn"]
+                    output_format_select = gr.Dropdown(
+                        label="Output Format",
+                        choices=OUTPUT_FORMATS,
+                        value=DEFAULT_OUTPUT_FORMAT,
+                        info="JSONL and CSV stream well, Parquet/Arrow are compact and columnar"
+                    )
+                    
+                    use_cache_input = gr.Checkbox(
+                        label="Reuse cached results",
+                        value=True,
+                        info="Return a previous result for an identical request instead of calling the model"
                     )
+                    
+                    with gr.Row():
+                        generate_btn = gr.Button(
+                            "🚀 Generate Dataset", 
+                            variant="primary", 
+                            size="lg",
+                            elem_classes=["generate-btn"]
+                        )
+                        
+                        cancel_btn = gr.Button("🛑 Cancel", variant="stop", size="lg")
                 
                 # Output Column
                 with gr.Column(scale=1):
@@ -159,6 +267,26 @@ class DatasetGeneratorApp:
                         visible=False
                     )
             
+            # ID of the job started from this page, empty when none is running
+            job_id_state = gr.State("")
+            
+            with gr.Accordion("Resume a stopped job", open=False):
+                with gr.Row():
+                    resume_select = gr.Dropdown(
+                        label="Stopped Jobs",
+                        choices=[],
+                        info="Jobs that failed, were cancelled or stopped before their dataset was complete. "
+                             "The API key above is used, or the provider's environment variable when it is empty"
+                    )
+                    refresh_btn = gr.Button("🔄 Refresh", size="sm")
+                resume_btn = gr.Button("▶️ Resume Job")
+            
+            preview_output = gr.Dataframe(
+                label=f"Latest Records (up to {PREVIEW_ROWS})",
+                interactive=False,
+                wrap=True
+            )
+            
             # Event Handlers
             model_select.change(
                 fn=self._update_api_key_visibility,
@@ -168,9 +296,29 @@ class DatasetGeneratorApp:
             
             # Generate dataset and handle file output
             generate_btn.click(
-                fn=self._generate_dataset_wrapper,
-                inputs=[prompt_input, num_records, model_select, api_key_input],
-                outputs=[download_file, status_output]
+                fn=self._generate_dataset_job,
+                inputs=[prompt_input, num_records, model_select, api_key_input, use_cache_input, output_format_select],
+                outputs=[download_file, status_output, preview_output, job_id_state],
+                concurrency_limit=None  # the job manager enforces per-model limits
+            )
+            
+            resume_btn.click(
+                fn=self._resume_dataset_job,
+                inputs=[resume_select, api_key_input],
+                outputs=[download_file, status_output, preview_output, job_id_state],
+                concurrency_limit=None
+            ).then(
+                fn=self._resumable_jobs,
+                outputs=[resume_select]
+            )
+            
+            refresh_btn.click(fn=self._resumable_jobs, outputs=[resume_select])
+            app.load(fn=self._resumable_jobs, outputs=[resume_select])
+            
+            cancel_btn.click(
+                fn=self._cancel_job,
+                inputs=[job_id_state],
+                outputs=[status_output]
             )
         
         return app
@@ -178,6 +326,8 @@ class DatasetGeneratorApp:
     def launch(self, share: bool = False) -> None:
         """Launch the Gradio application"""
         interface = self.create_interface()
+        if METRICS_ENABLED:
+            start_metrics_server(METRICS_HOST, METRICS_PORT)
         interface.launch(
             share=share, 
             server_name=SERVER_HOST, 